@@ -0,0 +1,285 @@
+"""
+Agenda index for Toodledo tasks
+Sorted index over due, start and reminder times of open tasks, with
+expansion of repeating tasks into a date window
+"""
+
+import calendar
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from models import Task
+
+FIELDS = ("due", "start", "remind")
+
+WEEKDAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+
+# Upper bound on occurrences per repeating task inside a query window
+MAX_OCCURRENCES = 400
+
+
+def due_time(task: Task) -> int:
+    """Effective due timestamp (duetime if set, else duedate; 0 = none)"""
+    # Toodledo sends a time without a date as a 1970 timestamp, so ignore it
+    if not task.duedate:
+        return 0
+    return task.duetime or task.duedate
+
+
+def start_time(task: Task) -> int:
+    """Effective start timestamp (starttime if set, else startdate; 0 = none)"""
+    if not task.startdate:
+        return 0
+    return task.starttime or task.startdate
+
+
+def remind_time(task: Task) -> int:
+    """Reminder timestamp (remind is minutes before due; 0 = none)"""
+    due = due_time(task)
+    if not task.remind or not due:
+        return 0
+    return due - task.remind * 60
+
+
+_KEY_FUNCS = {"due": due_time, "start": start_time, "remind": remind_time}
+
+
+# ============================================================================
+# Repeat rules
+# ============================================================================
+
+def parse_repeat(rule: Optional[str]) -> Optional[Dict[str, str]]:
+    """
+    Parse a Toodledo repeat rule (iCal RRULE subset)
+
+    Returns None for empty rules and rules that repeat from the completion
+    date, since their future occurrences cannot be predicted.
+    """
+    if not rule:
+        return None
+    parts: Dict[str, str] = {}
+    for item in rule.upper().split(";"):
+        key, sep, value = item.strip().partition("=")
+        if key:
+            parts[key] = value if sep else ""
+    if "FROMCOMP" in parts or parts.get("FREQ") not in ("DAILY", "WEEKLY", "MONTHLY", "YEARLY"):
+        return None
+    return parts
+
+
+def _add_months(moment: datetime, months: int) -> datetime:
+    month_index = moment.month - 1 + months
+    year, month = moment.year + month_index // 12, month_index % 12 + 1
+    day = min(moment.day, calendar.monthrange(year, month)[1])
+    return moment.replace(year=year, month=month, day=day)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, nth: int) -> Optional[int]:
+    """Day of month of the nth (or -nth from the end) weekday, if it exists"""
+    days = [
+        day
+        for day in range(1, calendar.monthrange(year, month)[1] + 1)
+        if calendar.weekday(year, month, day) == weekday
+    ]
+    try:
+        return days[nth - 1] if nth > 0 else days[nth]
+    except IndexError:
+        return None
+
+
+def _months_between(start: datetime, end: datetime) -> int:
+    return (end.year - start.year) * 12 + end.month - start.month
+
+
+def iter_occurrences(anchor: int, rule: Dict[str, str], after: int = 0) -> Iterator[int]:
+    """
+    Generate occurrences of a repeat rule after an anchor timestamp
+
+    Args:
+        anchor: Timestamp of the current occurrence
+        rule: Parsed rule from parse_repeat
+        after: Skip ahead to occurrences at or after this timestamp
+
+    Yields:
+        Timestamps of later occurrences, in order
+    """
+    start = datetime.fromtimestamp(anchor, tz=timezone.utc)
+    # Occurrences before this are skipped without stepping through each one
+    skip_to = datetime.fromtimestamp(after, tz=timezone.utc) if after > anchor else start
+    freq = rule["FREQ"]
+    interval = max(int(rule.get("INTERVAL") or 1), 1)
+    until = None
+    if rule.get("UNTIL"):
+        until = datetime.strptime(rule["UNTIL"][:8], "%Y%m%d").replace(tzinfo=timezone.utc)
+        until += timedelta(days=1)
+    byday = [d.strip() for d in rule.get("BYDAY", "").split(",") if d.strip()]
+
+    def emit(moment: datetime) -> bool:
+        return until is None or moment < until
+
+    def skip(periods: int) -> int:
+        return max(periods - 1, 0) // interval * interval
+
+    weekdays = {WEEKDAYS[d[-2:]] for d in byday if d[-2:] in WEEKDAYS}
+    if freq == "WEEKLY" and weekdays:
+        week_start = start - timedelta(days=start.weekday())
+        moment = start + timedelta(days=max((skip_to - start).days - 1, 0))
+        while True:
+            moment += timedelta(days=1)
+            weeks = (moment - timedelta(days=moment.weekday()) - week_start).days // 7
+            if weeks % interval or moment.weekday() not in weekdays:
+                continue
+            if not emit(moment):
+                return
+            if moment >= skip_to:
+                yield int(moment.timestamp())
+    elif freq == "MONTHLY" and weekdays and byday[0][:-2].lstrip("-").isdigit():
+        nth, weekday = int(byday[0][:-2]), WEEKDAYS[byday[0][-2:]]
+        if not 1 <= abs(nth) <= 5:
+            return
+        months = skip(_months_between(start, skip_to))
+        while True:
+            months += interval
+            first = _add_months(start.replace(day=1), months)
+            day = _nth_weekday(first.year, first.month, weekday, nth)
+            if day is None:
+                continue
+            moment = first.replace(day=day)
+            if not emit(moment):
+                return
+            if moment >= skip_to:
+                yield int(moment.timestamp())
+    else:
+        if freq == "DAILY":
+            periods = (skip_to - start).days
+        elif freq == "WEEKLY":
+            periods = (skip_to - start).days // 7
+        elif freq == "MONTHLY":
+            periods = _months_between(start, skip_to)
+        else:
+            periods = skip_to.year - start.year
+        step = skip(periods)
+        while True:
+            step += interval
+            if freq == "DAILY":
+                moment = start + timedelta(days=step)
+            elif freq == "WEEKLY":
+                moment = start + timedelta(weeks=step)
+            elif freq == "MONTHLY":
+                moment = _add_months(start, step)
+            else:
+                moment = _add_months(start, 12 * step)
+            if not emit(moment):
+                return
+            if moment >= skip_to:
+                yield int(moment.timestamp())
+
+
+# ============================================================================
+# Index
+# ============================================================================
+
+class AgendaIndex:
+    """Sorted (timestamp, task id) index over open tasks"""
+
+    def __init__(self):
+        self.tasks: Dict[int, Task] = {}
+        self.keys: Dict[str, List[Tuple[int, int]]] = {field: [] for field in FIELDS}
+        self.repeating: Set[int] = set()
+
+    # ------------------------------------------------------------------
+    # Cache index protocol
+    # ------------------------------------------------------------------
+
+    def rebuild(self, tasks: Iterable[Task]) -> None:
+        """Rebuild the index from scratch"""
+        self.tasks = {}
+        self.keys = {field: [] for field in FIELDS}
+        self.repeating = set()
+        for task in tasks:
+            if task.completed:
+                continue
+            self.tasks[task.id] = task
+            for field, key_func in _KEY_FUNCS.items():
+                timestamp = key_func(task)
+                if timestamp:
+                    self.keys[field].append((timestamp, task.id))
+            if task.repeat:
+                self.repeating.add(task.id)
+        for keys in self.keys.values():
+            keys.sort()
+
+    def upsert(self, task: Task, previous: Optional[Task]) -> None:
+        """Index a new or edited task"""
+        if previous is not None:
+            self.remove(previous)
+        if task.completed:
+            return
+        self.tasks[task.id] = task
+        for field, key_func in _KEY_FUNCS.items():
+            timestamp = key_func(task)
+            if timestamp:
+                insort(self.keys[field], (timestamp, task.id))
+        if task.repeat:
+            self.repeating.add(task.id)
+
+    def remove(self, previous: Task) -> None:
+        """Drop a task using the values it was indexed with"""
+        indexed = self.tasks.pop(previous.id, None)
+        if indexed is None:
+            return
+        for field, key_func in _KEY_FUNCS.items():
+            timestamp = key_func(indexed)
+            if not timestamp:
+                continue
+            keys = self.keys[field]
+            position = bisect_left(keys, (timestamp, indexed.id))
+            if position < len(keys) and keys[position] == (timestamp, indexed.id):
+                del keys[position]
+        self.repeating.discard(indexed.id)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def range(self, field: str, start: int, end: int) -> List[Tuple[int, Task]]:
+        """
+        Get tasks whose field falls within [start, end]
+
+        Args:
+            field: due, start or remind
+            start: Range start timestamp (inclusive)
+            end: Range end timestamp (inclusive)
+
+        Returns:
+            (timestamp, task) pairs in time order
+        """
+        if field not in self.keys:
+            raise ValueError(f"Unknown agenda field '{field}'. Use one of: {', '.join(FIELDS)}")
+        keys = self.keys[field]
+        low = bisect_left(keys, (start, -1))
+        high = bisect_right(keys, (end, float("inf")))
+        return [(timestamp, self.tasks[task_id]) for timestamp, task_id in keys[low:high]]
+
+    def occurrences(self, start: int, end: int) -> List[Tuple[int, Task]]:
+        """
+        Expand repeating tasks into future due occurrences within [start, end]
+
+        The current occurrence of each task is already in the due index, so
+        only later occurrences are returned.
+        """
+        results: List[Tuple[int, Task]] = []
+        for task_id in self.repeating:
+            task = self.tasks[task_id]
+            anchor = due_time(task)
+            rule = parse_repeat(task.repeat)
+            if not anchor or anchor > end or rule is None:
+                continue
+            for count, timestamp in enumerate(iter_occurrences(anchor, rule, after=start)):
+                if timestamp > end or count >= MAX_OCCURRENCES:
+                    break
+                if timestamp >= start:
+                    results.append((timestamp, task))
+        results.sort(key=lambda item: (item[0], item[1].id))
+        return results
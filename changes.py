@@ -0,0 +1,136 @@
+"""
+Change tracking for Toodledo tasks
+Opaque sync cursors over the account's lastedit/lastdelete markers, used to
+return only the tasks changed or deleted since a client last looked
+"""
+
+import base64
+import json
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+CURSOR_VERSION = 2
+
+# Toodledo markers have one-second resolution and its `after` filters are
+# exclusive, so an edit in the same second a cursor was issued would never be
+# seen. A cursor issued within this many seconds of its marker (allowing for
+# clock skew) re-reads that second once, skipping the ids it already reported.
+RECHECK_WINDOW = 60
+
+
+class SyncCursor(NamedTuple):
+    """Decoded sync cursor"""
+
+    last_edit: int
+    last_delete: int
+    issued: int = 0
+    edit_ids: Sequence[int] = ()
+    delete_ids: Sequence[int] = ()
+
+
+def encode_sync_cursor(
+    account: str,
+    last_edit: int,
+    last_delete: int,
+    issued: int = 0,
+    edit_ids: Sequence[int] = (),
+    delete_ids: Sequence[int] = (),
+) -> str:
+    """Build an opaque cursor for an account's current markers"""
+    fields = [
+        CURSOR_VERSION, account, last_edit, last_delete, issued, list(edit_ids), list(delete_ids)
+    ]
+    raw = json.dumps(fields, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_sync_cursor(cursor: str, account: str) -> SyncCursor:
+    """Decode a cursor issued for this account (version 1 cursors are still accepted)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        version, owner, *fields = json.loads(base64.urlsafe_b64decode(padded))
+        last_edit, last_delete = int(fields[0]), int(fields[1])
+        issued, edit_ids, delete_ids = fields[2:5] if version == CURSOR_VERSION else (0, [], [])
+        parsed = SyncCursor(
+            last_edit,
+            last_delete,
+            int(issued),
+            [int(i) for i in edit_ids],
+            [int(i) for i in delete_ids],
+        )
+    except (ValueError, TypeError, IndexError):
+        raise ValueError("Invalid sync cursor")
+    if version not in (1, CURSOR_VERSION) or owner != account:
+        raise ValueError("Sync cursor was issued for a different account or server version")
+    return parsed
+
+
+def _reread(current: int, marker: int, issued: int) -> bool:
+    """Check if a marker's range must be read (changed, or cursor issued too close to it)"""
+    return current > marker or issued - marker < RECHECK_WINDOW
+
+
+def _boundary_ids(items: List[Dict[str, Any]], key: str, marker: int) -> List[int]:
+    return [int(item["id"]) for item in items if int(item.get(key) or 0) == marker]
+
+
+def get_changes(client, account: str, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Get tasks changed or deleted since a sync cursor
+
+    Without a cursor only a starting cursor is returned. Reads include the
+    cursor's own second (see RECHECK_WINDOW), so no change is lost; tasks
+    edited while the changes are being read may be reported again on the
+    next call.
+
+    Args:
+        client: ToodledoClient
+        account: Account name the cursor is bound to
+        cursor: Cursor from a previous call
+
+    Returns:
+        {"cursor": ..., "changed": [task dicts], "deleted": [{"id", "stamp"}]}
+    """
+    issued = int(time.time())
+    info = client.get_account_info()
+    last_edit = int(info.get("lastedit_task") or 0)
+    last_delete = int(info.get("lastdelete_task") or 0)
+    if not cursor:
+        return {
+            "cursor": encode_sync_cursor(account, last_edit, last_delete, issued),
+            "changed": [],
+            "deleted": [],
+        }
+
+    since = decode_sync_cursor(cursor, account)
+    changed: List[Dict[str, Any]] = []
+    deleted: List[Dict[str, Any]] = []
+    if _reread(last_edit, since.last_edit, since.issued):
+        seen = set(since.edit_ids)
+        changed = [
+            task.to_api()
+            for task in client.get_all_tasks(after=max(since.last_edit - 1, 0))
+            if not (task.modified == since.last_edit and task.id in seen)
+        ]
+    if _reread(last_delete, since.last_delete, since.issued):
+        seen = set(since.delete_ids)
+        deleted = [
+            item
+            for item in client.get_deleted_tasks(after=max(since.last_delete - 1, 0))
+            if not (int(item.get("stamp") or 0) == since.last_delete and int(item["id"]) in seen)
+        ]
+
+    # Ids already reported for the new markers' own second
+    edit_ids = _boundary_ids(changed, "modified", last_edit)
+    if last_edit == since.last_edit:
+        edit_ids += since.edit_ids
+    delete_ids = _boundary_ids(deleted, "stamp", last_delete)
+    if last_delete == since.last_delete:
+        delete_ids += since.delete_ids
+    return {
+        "cursor": encode_sync_cursor(
+            account, last_edit, last_delete, issued, edit_ids, delete_ids
+        ),
+        "changed": changed,
+        "deleted": deleted,
+    }
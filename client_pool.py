@@ -0,0 +1,203 @@
+"""
+Multi-account client pool for Toodledo
+Keeps one token store, client, rate limiter and task cache per account,
+sharing a single HTTP connection pool, with LRU eviction of idle accounts
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from agenda import AgendaIndex
+from config import get_settings
+from rate_limiter import RateLimiter
+from request_scheduler import BACKGROUND, BULK, INTERACTIVE, RequestScheduler
+from task_cache import TaskCache
+from task_table import TaskTable
+from task_tree import TaskTree
+from token_manager import TokenManager
+from toodledo_client import ToodledoClient
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ACCOUNT = "default"
+
+_ACCOUNT_NAME = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+# Lookup list -> account field holding its last edit time
+LOOKUP_MARKERS = {
+    "folders": "lastedit_folder",
+    "contexts": "lastedit_context",
+    "goals": "lastedit_goal",
+    "locations": "lastedit_location",
+}
+
+
+class AccountContext:
+    """Everything the server holds for a single Toodledo account"""
+
+    def __init__(
+        self,
+        name: str,
+        token_manager: TokenManager,
+        scheduler: RequestScheduler,
+        session: requests.Session,
+    ):
+        self.settings = get_settings()
+        self.name = name
+        self.token_manager = token_manager
+        self.scheduler = scheduler
+        self.rate_limiter = scheduler.rate_limiter
+        self.client = ToodledoClient(self.token_manager, session, self.scheduler)
+        self.task_cache = TaskCache(self.client)
+        self.task_tree = TaskTree()
+        self.task_cache.add_index(self.task_tree)
+        self.agenda_index = AgendaIndex()
+        self.task_cache.add_index(self.agenda_index)
+        self.last_used = time.monotonic()
+        self._task_table: Optional[TaskTable] = None
+        self._task_table_version = -1
+        # Lookup list -> (fetched at, lastedit marker or None if unknown, data)
+        self._lookups: Dict[str, Tuple[float, Optional[int], Any]] = {}
+
+    def task_table(self) -> TaskTable:
+        """Sync the task cache and return a columnar table, rebuilt only on change"""
+        self.task_cache.sync()
+        if self._task_table is None or self._task_table_version != self.task_cache.version:
+            self._task_table = TaskTable.from_tasks(self.task_cache.all())
+            self._task_table_version = self.task_cache.version
+        return self._task_table
+
+    def lookup(self, kind: str) -> Any:
+        """Get a lookup list (folders, contexts, goals, locations), cached for a while"""
+        entry = self._lookups.get(kind)
+        if entry is not None and time.monotonic() - entry[0] < self.settings.lookup_cache_ttl:
+            return entry[2]
+        return self.fetch_lookup(kind, None)
+
+    def fetch_lookup(self, kind: str, marker: Optional[int]) -> Any:
+        """Fetch a lookup list from the API and cache it against a lastedit marker"""
+        data = getattr(self.client, f"get_{kind}")()
+        self._lookups[kind] = (time.monotonic(), marker, data)
+        return data
+
+    def check_lookups(self, account: Dict[str, Any]) -> Dict[str, int]:
+        """
+        Validate cached lookup lists against the account's lastedit markers
+
+        Unchanged lists are marked fresh again; changed ones are dropped.
+        Lists fetched without a known marker adopt the current one and keep
+        their fetch time, so the cache TTL still bounds their age.
+
+        Returns:
+            Lookup lists that need fetching, with their current markers
+        """
+        stale = {}
+        for kind, field in LOOKUP_MARKERS.items():
+            marker = int(account.get(field) or 0)
+            entry = self._lookups.get(kind)
+            if entry is not None and entry[1] is None:
+                self._lookups[kind] = (entry[0], marker, entry[2])
+            elif entry is not None and entry[1] == marker:
+                self._lookups[kind] = (time.monotonic(), marker, entry[2])
+            else:
+                self._lookups.pop(kind, None)
+                stale[kind] = marker
+        return stale
+
+
+class ClientPool:
+    """LRU pool of per-account contexts"""
+
+    def __init__(
+        self,
+        max_accounts: Optional[int] = None,
+        idle_timeout: Optional[int] = None,
+    ):
+        self.settings = get_settings()
+        self.max_accounts = max_accounts or self.settings.max_active_accounts
+        self.idle_timeout = idle_timeout or self.settings.account_idle_timeout
+        self.accounts_dir = Path(self.settings.accounts_dir).expanduser()
+        self._accounts: "OrderedDict[str, AccountContext]" = OrderedDict()
+        # Token store and request scheduler per account. These outlive evicted
+        # contexts, so a context rebuilt while an evicted one is still in use
+        # (e.g. by a long import) shares its refresh lock and rate budget.
+        self._shared: Dict[str, Tuple[TokenManager, RequestScheduler]] = {}
+        self._lock = threading.Lock()
+
+        # One connection pool shared by every account
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(self.max_accounts, 10))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def token_path(self, account: str) -> str:
+        """Get the token storage path for an account"""
+        if account == DEFAULT_ACCOUNT:
+            return self.settings.token_storage_path
+        return str(self.accounts_dir / f"{account}.json")
+
+    def get(self, account: Optional[str] = None) -> AccountContext:
+        """
+        Get the context for an account, creating it if needed
+
+        Args:
+            account: Account name (default: "default", which uses TOKEN_STORAGE_PATH)
+
+        Returns:
+            AccountContext for the account
+        """
+        account = account or DEFAULT_ACCOUNT
+        if not _ACCOUNT_NAME.match(account):
+            raise ValueError(f"Invalid account name: {account!r}")
+
+        with self._lock:
+            self._evict_idle()
+            context = self._accounts.get(account)
+            if context is None:
+                shared = self._shared.get(account)
+                if shared is None:
+                    shared = self._shared[account] = self._create_shared(account)
+                context = AccountContext(account, *shared, self.session)
+                self._accounts[account] = context
+                logger.info(f"Opened account '{account}'")
+                while len(self._accounts) > self.max_accounts:
+                    evicted, _ = self._accounts.popitem(last=False)
+                    logger.info(f"Evicted least recently used account '{evicted}'")
+            else:
+                self._accounts.move_to_end(account)
+            context.last_used = time.monotonic()
+            return context
+
+    def _create_shared(self, account: str) -> Tuple[TokenManager, RequestScheduler]:
+        settings = self.settings
+        scheduler = RequestScheduler(
+            RateLimiter(settings.api_rate_limit, settings.api_rate_burst),
+            {
+                INTERACTIVE: settings.max_concurrent_interactive,
+                BACKGROUND: settings.max_concurrent_background,
+                BULK: settings.max_concurrent_bulk,
+            },
+        )
+        return TokenManager(self.token_path(account)), scheduler
+
+    def _evict_idle(self) -> None:
+        cutoff = time.monotonic() - self.idle_timeout
+        for name in [name for name, ctx in self._accounts.items() if ctx.last_used < cutoff]:
+            del self._accounts[name]
+            logger.info(f"Evicted idle account '{name}'")
+
+    def active(self) -> List[AccountContext]:
+        """Get the currently loaded account contexts"""
+        with self._lock:
+            return list(self._accounts.values())
+
+    def __len__(self) -> int:
+        return len(self._accounts)
@@ -21,11 +21,52 @@ class Settings(BaseSettings):
     # Token Storage
     token_storage_path: str = str(Path.home() / ".config" / "toodledo" / "tokens.json")
 
+    # Multi-account: token files for accounts other than "default" live here
+    accounts_dir: str = str(Path.home() / ".config" / "toodledo" / "accounts")
+    max_active_accounts: int = 16
+    account_idle_timeout: int = 1800  # seconds before an unused account is evicted
+
+    # Per-account API rate limit
+    api_rate_limit: float = 2.0  # requests per second
+    api_rate_burst: int = 10
+
+    # Per-account concurrent API requests by priority class
+    max_concurrent_interactive: int = 4
+    max_concurrent_background: int = 1
+    max_concurrent_bulk: int = 2
+
+    # export_tasks/import_tasks tools may only use files in this directory
+    transfer_dir: str = str(Path.home() / "toodledo-transfers")
+
+    # Resource change notifications: seconds between lastedit checks
+    resource_poll_interval: int = 60
+
+    # Paginated tool responses
+    response_max_bytes: int = 50000  # default page size budget
+    snapshot_ttl: int = 600  # seconds a result snapshot stays available to cursors
+    max_snapshots: int = 32
+
+    # Background prefetching while idle
+    prefetch_enabled: bool = True
+    prefetch_interval: int = 300  # seconds between idle re-syncs per account
+    prefetch_idle_delay: float = 2.0  # seconds without tool calls before prefetching
+    prefetch_rate_reserve: int = 5  # rate limit tokens kept free for interactive calls
+    token_refresh_margin: int = 900  # refresh tokens this many seconds before expiry
+    lookup_cache_ttl: int = 300  # seconds folders/contexts/goals/locations are reused
+
     # Server Configuration
     mcp_host: str = "0.0.0.0"
     mcp_port: int = 8000
     log_level: str = "INFO"
 
+    # Logging (written by a background thread to a rotating file)
+    log_file: str = "/tmp/toodledo_mcp.log"
+    log_max_bytes: int = 10 * 1024 * 1024
+    log_backup_count: int = 3
+    log_queue_size: int = 10000  # records beyond this are dropped rather than blocking
+    log_info_sample_rate: float = 1.0  # fraction of INFO records kept
+    log_debug_sample_rate: float = 0.1  # fraction of DEBUG records kept
+
     # Scopes for OAuth2 (write scope required for task creation)
     scopes: str = "basic tasks write folders"
 
@@ -0,0 +1,169 @@
+"""
+Logging setup for Toodledo MCP Server
+Queues log records to a background writer with a rotating log file, samples
+low-level records, and summarizes tool arguments with secrets redacted
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import re
+from typing import Any, Dict, Optional
+
+# Keys whose values are never logged (whole key names, case-insensitive)
+SECRET_KEYS = frozenset({
+    "access_token", "refresh_token", "token", "code", "client_secret", "secret",
+    "password", "authorization", "credentials",
+})
+
+# key=value query parameters carrying secrets, e.g. in request URLs
+_SECRET_PARAM = re.compile(
+    r"\b((?:access_token|refresh_token|code|client_secret)=)[^&\s'\"]+", re.IGNORECASE
+)
+
+# Limits for argument summaries
+MAX_STRING = 80
+MAX_ITEMS = 10
+MAX_DEPTH = 3
+MAX_SUMMARY = 1000
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of records at sampled levels"""
+
+    def __init__(self, rates: Dict[int, float]):
+        """
+        Args:
+            rates: Level -> fraction of records to keep (levels not listed keep all)
+        """
+        super().__init__()
+        self.every = {level: max(round(1 / rate), 1) for level, rate in rates.items() if rate > 0}
+        self.dropped = {level for level, rate in rates.items() if rate <= 0}
+        self.counts: Dict[int, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno in self.dropped:
+            return False
+        every = self.every.get(record.levelno)
+        if every is None or every == 1:
+            return True
+        count = self.counts.get(record.levelno, 0)
+        self.counts[record.levelno] = count + 1
+        return count % every == 0
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _summarize(value: Any, depth: int) -> Any:
+    if isinstance(value, str):
+        if len(value) > MAX_STRING:
+            return f"{value[:MAX_STRING]}...(+{len(value) - MAX_STRING} chars)"
+        return value
+    if isinstance(value, dict):
+        if depth >= MAX_DEPTH:
+            return f"{{dict of {len(value)} keys}}"
+        summary = {}
+        for i, (key, item) in enumerate(value.items()):
+            if i >= MAX_ITEMS:
+                summary["..."] = f"+{len(value) - MAX_ITEMS} keys"
+                break
+            secret = str(key).lower() in SECRET_KEYS
+            summary[key] = "***" if secret else _summarize(item, depth + 1)
+        return summary
+    if isinstance(value, (list, tuple)):
+        if depth >= MAX_DEPTH or len(value) > MAX_ITEMS:
+            return f"[list of {len(value)} items]"
+        return [_summarize(item, depth + 1) for item in value]
+    return value
+
+
+def summarize_arguments(arguments: Any) -> str:
+    """
+    Describe tool arguments for logging
+
+    Secret-looking keys are redacted, long strings and collections are
+    shortened, and the whole summary is capped at MAX_SUMMARY characters.
+    """
+    summary = repr(_summarize(arguments, 0))
+    if len(summary) > MAX_SUMMARY:
+        summary = f"{summary[:MAX_SUMMARY]}...(+{len(summary) - MAX_SUMMARY} chars)"
+    return summary
+
+
+def redact_secrets(text: str, *secrets: str) -> str:
+    """
+    Mask secret query parameters and known secret values in a message
+
+    requests includes the full request URL (with its access_token) in
+    HTTPError messages, so API errors pass through this before being raised.
+    """
+    text = _SECRET_PARAM.sub(r"\1***", text)
+    for secret in secrets:
+        if secret:
+            text = text.replace(secret, "***")
+    return text
+
+
+def configure_logging(settings) -> None:
+    """
+    Route all logging through a queue to a background rotating file writer
+
+    Log calls only merge the message arguments (and format any traceback)
+    before enqueueing the record; applying the formatter and disk I/O
+    happen on the listener thread.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        settings.log_file,
+        maxBytes=settings.log_max_bytes,
+        backupCount=settings.log_backup_count,
+        encoding="utf-8",
+    )
+    file_handler.setFormatter(
+        logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    )
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.log_queue_size)
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.addFilter(
+        SamplingFilter({
+            logging.DEBUG: settings.log_debug_sample_rate,
+            logging.INFO: settings.log_info_sample_rate,
+        })
+    )
+
+    root = logging.getLogger()
+    root.setLevel(settings.log_level.upper())
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(log_queue, file_handler)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the background writer"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -5,34 +5,64 @@ Model Context Protocol server for Toodledo task management
 """
 
 import asyncio
+import contextvars
 import json
 import logging
+from datetime import date, timedelta
 from typing import Any, Dict, Optional, List
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 import mcp.types as types
 
+from agenda import FIELDS as AGENDA_FIELDS
+from changes import get_changes
+from client_pool import DEFAULT_ACCOUNT, AccountContext, ClientPool
 from config import get_settings
-from token_manager import TokenManager
-from toodledo_client import ToodledoClient
+from logging_setup import configure_logging, summarize_arguments
+from pagination import SnapshotStore, byte_budget
+from prefetcher import Prefetcher
+from resources import (
+    ResourceWatcher,
+    list_resources,
+    parse_uri,
+    read_resource,
+    task_summary,
+)
+from task_table import GROUP_COLUMNS, OPERATIONS, format_date, parse_date
+from task_transfer import (
+    FORMATS as TRANSFER_FORMATS,
+    export_tasks,
+    import_tasks,
+    resolve_transfer_path,
+)
+
+settings = get_settings()
 
 # Configure logging to file to avoid interfering with stdio/JSON-RPC protocol
 # Logging to stdout would corrupt the MCP protocol communication
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    filename="/tmp/toodledo_mcp.log"  # Log to file instead of stdout
-)
+# Records are queued and written by a background thread so tool calls never wait on disk
+configure_logging(settings)
 logger = logging.getLogger(__name__)
 
 # Initialize components
-settings = get_settings()
-token_manager = TokenManager()
-client = ToodledoClient(token_manager)
+client_pool = ClientPool()
+snapshots = SnapshotStore(settings.max_snapshots, settings.snapshot_ttl)
+
+# Account the current tool call runs against (set per call in handle_call_tool)
+_current_account: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "current_account", default=DEFAULT_ACCOUNT
+)
+
+
+def current_account() -> AccountContext:
+    """Get the pooled context for the account of the current tool call."""
+    return client_pool.get(_current_account.get())
 
 # Initialize MCP server
 server = Server(name="toodledo")
+resource_watcher = ResourceWatcher(client_pool, settings.resource_poll_interval)
+prefetcher = Prefetcher(client_pool)
 
 # ============================================================================
 # Tool Definitions
@@ -149,6 +179,229 @@ TOOLS = [
             "required": []
         }
     ),
+    types.Tool(
+        name="task_stats",
+        description=(
+            "Compute aggregate statistics over all tasks on the server (counts, summed "
+            "estimated length, or histograms), optionally grouped and filtered. Use this "
+            "instead of fetching full task lists for questions like 'open tasks per folder'"
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "operation": {
+                    "type": "string",
+                    "enum": list(OPERATIONS),
+                    "default": "count",
+                    "description": "Aggregate to compute"
+                },
+                "group_by": {
+                    "type": "array",
+                    "items": {"type": "string", "enum": list(GROUP_COLUMNS)},
+                    "default": [],
+                    "description": "Columns to group by (count and sum)"
+                },
+                "column": {
+                    "type": "string",
+                    "description": (
+                        "Column to sum (length) or bucket for histogram "
+                        "(duedate, startdate, completed, modified, priority, length, ...)"
+                    )
+                },
+                "bucket": {
+                    "type": ["string", "integer"],
+                    "description": "Histogram bucket: 'day'/'week' for dates, a width otherwise"
+                },
+                "filters": {
+                    "type": "object",
+                    "description": "Row filters",
+                    "properties": {
+                        "completed": {"type": "boolean"},
+                        "starred": {"type": "boolean"},
+                        "folder": {"type": "integer"},
+                        "context": {"type": "integer"},
+                        "goal": {"type": "integer"},
+                        "location": {"type": "integer"},
+                        "status": {"type": "integer"},
+                        "priority_min": {"type": "integer", "minimum": -1, "maximum": 3},
+                        "due_from": {"type": "string", "pattern": "^\\d{4}-\\d{2}-\\d{2}$"},
+                        "due_to": {"type": "string", "pattern": "^\\d{4}-\\d{2}-\\d{2}$"}
+                    }
+                }
+            },
+            "required": []
+        }
+    ),
+    types.Tool(
+        name="get_task_tree",
+        description=(
+            "Get a task with its subtasks in order, plus rolled-up completion counts. "
+            "Without task_id, lists top-level tasks that have subtasks"
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "task_id": {
+                    "type": "integer",
+                    "description": "Root task ID (optional)"
+                },
+                "max_depth": {
+                    "type": "integer",
+                    "default": 3,
+                    "minimum": 0,
+                    "description": "Levels of subtasks to expand"
+                },
+                "include_completed": {
+                    "type": "boolean",
+                    "default": True,
+                    "description": "Include completed subtasks in the tree"
+                }
+            },
+            "required": []
+        }
+    ),
+    types.Tool(
+        name="agenda",
+        description=(
+            "Get open tasks due (or starting, or with reminders) today, tomorrow, this week, "
+            "overdue, or in a date range. Repeating tasks are expanded into the window"
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "view": {
+                    "type": "string",
+                    "enum": ["today", "tomorrow", "week", "overdue", "range"],
+                    "default": "today",
+                    "description": "Window to show (range uses start_date/end_date)"
+                },
+                "start_date": {
+                    "type": "string",
+                    "pattern": "^\\d{4}-\\d{2}-\\d{2}$",
+                    "description": "Range start in format YYYY-MM-DD"
+                },
+                "end_date": {
+                    "type": "string",
+                    "pattern": "^\\d{4}-\\d{2}-\\d{2}$",
+                    "description": "Range end in format YYYY-MM-DD (inclusive)"
+                },
+                "field": {
+                    "type": "string",
+                    "enum": list(AGENDA_FIELDS),
+                    "default": "due",
+                    "description": "Date to match: due date, start date or reminder time"
+                },
+                "expand_repeats": {
+                    "type": "boolean",
+                    "default": True,
+                    "description": "Include future occurrences of repeating tasks"
+                },
+                "limit": {
+                    "type": "integer",
+                    "default": 100,
+                    "minimum": 1,
+                    "maximum": 1000,
+                    "description": "Maximum entries to return"
+                }
+            },
+            "required": []
+        }
+    ),
+    types.Tool(
+        name="get_changes",
+        description=(
+            "Get only the tasks changed or deleted since a previous call. The first call "
+            "(without cursor) returns a sync cursor; pass it back later to receive the diff "
+            "and a new cursor"
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "since": {
+                    "type": "string",
+                    "description": "Sync cursor from a previous get_changes call"
+                }
+            },
+            "required": []
+        }
+    ),
+    types.Tool(
+        name="export_tasks",
+        description=(
+            "Export tasks to an NDJSON or CSV file in the server's transfer directory (for "
+            "backups and migration). Resumes an interrupted export to the same path; never "
+            "overwrites other existing files"
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "path": {
+                    "type": "string",
+                    "description": (
+                        "Output file path relative to the transfer directory (.ndjson or .csv)"
+                    )
+                },
+                "format": {
+                    "type": "string",
+                    "enum": list(TRANSFER_FORMATS),
+                    "description": "File format (default: from the file extension)"
+                },
+                "status": {
+                    "type": "string",
+                    "enum": ["incomplete", "complete", "all"],
+                    "default": "all",
+                    "description": "Tasks to export"
+                },
+                "resume": {
+                    "type": "boolean",
+                    "default": True,
+                    "description": "Continue an interrupted export instead of starting over"
+                }
+            },
+            "required": ["path"]
+        }
+    ),
+    types.Tool(
+        name="import_tasks",
+        description=(
+            "Create tasks from an NDJSON or CSV file in the server's transfer directory, "
+            "50 per request. Resumes an interrupted import of the same file"
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "path": {
+                    "type": "string",
+                    "description": (
+                        "Input file path relative to the transfer directory (.ndjson or .csv)"
+                    )
+                },
+                "format": {
+                    "type": "string",
+                    "enum": list(TRANSFER_FORMATS),
+                    "description": "File format (default: from the file extension)"
+                },
+                "resume": {
+                    "type": "boolean",
+                    "default": True,
+                    "description": "Skip records already imported by an interrupted run"
+                }
+            },
+            "required": ["path"]
+        }
+    ),
+    types.Tool(
+        name="get_request_metrics",
+        description=(
+            "Get API request scheduler metrics (queue depth, in-flight requests and wait "
+            "times per priority class) for each loaded account"
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {},
+            "required": []
+        }
+    ),
     types.Tool(
         name="health_check",
         description="Check if authorization is needed or if the MCP server is ready",
@@ -174,40 +427,101 @@ TOOLS = [
     )
 ]
 
+# Every tool can target a specific account; omitted means the default account
+for _tool in TOOLS:
+    _tool.inputSchema["properties"]["account"] = {
+        "type": "string",
+        "description": f"Account name (optional, defaults to '{DEFAULT_ACCOUNT}')"
+    }
+
+# List-returning tools serve large results in pages from a server-side snapshot
+PAGINATED_TOOLS = {
+    "get_tasks", "get_folders", "get_contexts", "get_goals", "get_locations",
+    "get_task_tree", "agenda", "get_changes",
+}
+for _tool in TOOLS:
+    if _tool.name not in PAGINATED_TOOLS:
+        continue
+    _tool.inputSchema["properties"].update({
+        "cursor": {
+            "type": "string",
+            "description": "next_cursor from a previous response, to get the following page"
+        },
+        "max_bytes": {
+            "type": "integer",
+            "minimum": 1,
+            "description": "Approximate response size budget in bytes"
+        },
+        "max_tokens": {
+            "type": "integer",
+            "minimum": 1,
+            "description": "Approximate response size budget in tokens"
+        },
+    })
+
 # ============================================================================
 # Tool Implementation Functions
 # ============================================================================
 
-async def get_tasks(status: str = "incomplete", starred_only: bool = False, limit: int = 100) -> Dict[str, Any]:
+def paginate(
+    kind: str,
+    fetch,
+    cursor: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+):
+    """Serve one budget-sized page of a list result, snapshotting the rest."""
+    owner = f"{_current_account.get()}:{kind}"
+    budget = byte_budget(max_bytes, max_tokens, settings.response_max_bytes)
+    return snapshots.paginate(owner, fetch, cursor, budget)
+
+
+async def get_tasks(
+    status: str = "incomplete",
+    starred_only: bool = False,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+) -> Dict[str, Any]:
     """Get tasks from Toodledo."""
     try:
+        ctx = current_account()
         # Map status parameter to Toodledo API comp value
         status_map = {"incomplete": 0, "complete": 1, "all": -1}
         comp = status_map.get(status.lower(), 0)
 
-        # Get tasks from API
-        result = client.get_tasks(
-            completed=comp,
-            star=1 if starred_only else None,
-            num=min(limit, 1000)
+        def fetch():
+            # Get tasks from API
+            result = ctx.client.get_tasks(
+                completed=comp,
+                star=1 if starred_only else None,
+                num=min(limit, 1000)
+            )
+            if isinstance(result, list):
+                return result[1:] if result and "num" in str(result[0]) else result
+            return result
+
+        tasks, page = await asyncio.to_thread(
+            paginate, "tasks", fetch, cursor, max_bytes, max_tokens
         )
 
         # Format response
-        if isinstance(result, list):
-            tasks = result[1:] if result and "num" in str(result[0]) else result
+        if isinstance(tasks, list):
             return {
                 "success": True,
                 "status": status,
                 "starred_only": starred_only,
                 "count": len(tasks),
                 "tasks": tasks,
+                **page,
             }
         else:
             return {
                 "success": True,
                 "status": status,
                 "starred_only": starred_only,
-                "data": result,
+                "data": tasks,
             }
     except Exception as e:
         logger.error(f"Failed to get tasks: {str(e)}")
@@ -217,14 +531,22 @@ async def get_tasks(status: str = "incomplete", starred_only: bool = False, limi
         }
 
 
-async def get_folders() -> Dict[str, Any]:
+async def get_folders(
+    cursor: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+) -> Dict[str, Any]:
     """Get all folders in Toodledo."""
     try:
-        folders = client.get_folders()
+        ctx = current_account()
+        folders, page = await asyncio.to_thread(
+            paginate, "folders", lambda: ctx.lookup("folders"), cursor, max_bytes, max_tokens
+        )
         return {
             "success": True,
             "count": len(folders) if isinstance(folders, list) else 0,
             "folders": folders,
+            **page,
         }
     except Exception as e:
         logger.error(f"Failed to get folders: {str(e)}")
@@ -234,14 +556,22 @@ async def get_folders() -> Dict[str, Any]:
         }
 
 
-async def get_contexts() -> Dict[str, Any]:
+async def get_contexts(
+    cursor: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+) -> Dict[str, Any]:
     """Get all contexts in Toodledo."""
     try:
-        contexts = client.get_contexts()
+        ctx = current_account()
+        contexts, page = await asyncio.to_thread(
+            paginate, "contexts", lambda: ctx.lookup("contexts"), cursor, max_bytes, max_tokens
+        )
         return {
             "success": True,
             "count": len(contexts) if isinstance(contexts, list) else 0,
             "contexts": contexts,
+            **page,
         }
     except Exception as e:
         logger.error(f"Failed to get contexts: {str(e)}")
@@ -254,7 +584,8 @@ async def get_contexts() -> Dict[str, Any]:
 async def get_account_info() -> Dict[str, Any]:
     """Get Toodledo account information."""
     try:
-        account = client.get_account_info()
+        ctx = current_account()
+        account = await asyncio.to_thread(ctx.client.get_account_info)
         return {
             "success": True,
             "account": account,
@@ -277,7 +608,9 @@ async def create_task(
 ) -> Dict[str, Any]:
     """Create a new task in Toodledo."""
     try:
-        result = client.create_task(
+        ctx = current_account()
+        result = await asyncio.to_thread(
+            ctx.client.create_task,
             title=title,
             folder=folder,
             context=context,
@@ -298,14 +631,22 @@ async def create_task(
         }
 
 
-async def get_goals() -> Dict[str, Any]:
+async def get_goals(
+    cursor: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+) -> Dict[str, Any]:
     """Get all goals in Toodledo."""
     try:
-        goals = client.get_goals()
+        ctx = current_account()
+        goals, page = await asyncio.to_thread(
+            paginate, "goals", lambda: ctx.lookup("goals"), cursor, max_bytes, max_tokens
+        )
         return {
             "success": True,
             "count": len(goals) if isinstance(goals, list) else 0,
             "goals": goals,
+            **page,
         }
     except Exception as e:
         logger.error(f"Failed to get goals: {str(e)}")
@@ -315,14 +656,22 @@ async def get_goals() -> Dict[str, Any]:
         }
 
 
-async def get_locations() -> Dict[str, Any]:
+async def get_locations(
+    cursor: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+) -> Dict[str, Any]:
     """Get all locations in Toodledo."""
     try:
-        locations = client.get_locations()
+        ctx = current_account()
+        locations, page = await asyncio.to_thread(
+            paginate, "locations", lambda: ctx.lookup("locations"), cursor, max_bytes, max_tokens
+        )
         return {
             "success": True,
             "count": len(locations) if isinstance(locations, list) else 0,
             "locations": locations,
+            **page,
         }
     except Exception as e:
         logger.error(f"Failed to get locations: {str(e)}")
@@ -332,13 +681,320 @@ async def get_locations() -> Dict[str, Any]:
         }
 
 
+async def task_stats(
+    operation: str = "count",
+    group_by: Optional[List[str]] = None,
+    column: Optional[str] = None,
+    bucket: Any = None,
+    filters: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Compute aggregate statistics over all tasks."""
+    try:
+        ctx = current_account()
+
+        def compute():
+            # The first call loads every task, so keep it off the event loop
+            table = ctx.task_table()
+            result = table.query(
+                operation,
+                group_by=group_by or [],
+                column=column,
+                bucket=bucket,
+                filters=filters,
+            )
+            return len(table), result
+
+        total, result = await asyncio.to_thread(compute)
+        return {
+            "success": True,
+            "total_tasks": total,
+            **result,
+        }
+    except Exception as e:
+        logger.error(f"Failed to compute task stats: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e),
+        }
+
+
+async def get_task_tree(
+    task_id: Optional[int] = None,
+    max_depth: int = 3,
+    include_completed: bool = True,
+    cursor: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Get a subtask tree from the in-memory index."""
+    try:
+        ctx = current_account()
+        if task_id is None:
+            def fetch():
+                ctx.task_cache.sync()
+                with ctx.task_cache.reading():
+                    return [
+                        {
+                            "id": task.id,
+                            "title": task.title,
+                            "rollup": ctx.task_tree.rollup(task.id),
+                        }
+                        for task in ctx.task_tree.roots()
+                    ]
+
+            projects, page = await asyncio.to_thread(
+                paginate, "projects", fetch, cursor, max_bytes, max_tokens
+            )
+            return {
+                "success": True,
+                "count": len(projects),
+                "projects": projects,
+                **page,
+            }
+
+        # Page through the root's children; each child carries its own subtree
+        tree: Dict[str, Any] = {"id": task_id}
+
+        def fetch():
+            ctx.task_cache.sync()
+            with ctx.task_cache.reading():
+                node = ctx.task_tree.subtree(
+                    task_id, max_depth=max_depth, include_completed=include_completed
+                )
+            if node is None:
+                raise ValueError(f"Task {task_id} not found")
+            tree.update(node)
+            return tree.pop("children", None)
+
+        children, page = await asyncio.to_thread(
+            paginate, f"tree:{task_id}", fetch, cursor, max_bytes, max_tokens
+        )
+        if children is not None:
+            tree["children"] = children
+        return {
+            "success": True,
+            "tree": tree,
+            **page,
+        }
+    except Exception as e:
+        logger.error(f"Failed to get task tree: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e),
+        }
+
+
+def _agenda_window(view: str, start_date: Optional[str], end_date: Optional[str]):
+    """Resolve an agenda view to an inclusive (start, end) timestamp range."""
+    today = date.today()
+    if view == "range":
+        if not start_date:
+            raise ValueError("range view requires start_date")
+        return parse_date(start_date), parse_date(end_date or start_date, end_of_day=True)
+    if view == "overdue":
+        return 1, parse_date(today.isoformat()) - 1
+    days = {"today": (0, 0), "tomorrow": (1, 1), "week": (0, 6)}.get(view)
+    if days is None:
+        raise ValueError(f"Unknown agenda view '{view}'")
+    first, last = (today + timedelta(days=offset) for offset in days)
+    return parse_date(first.isoformat()), parse_date(last.isoformat(), end_of_day=True)
+
+
+async def agenda(
+    view: str = "today",
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    field: str = "due",
+    expand_repeats: bool = True,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Get open tasks falling in a date window from the agenda index."""
+    try:
+        ctx = current_account()
+        start, end = _agenda_window(view, start_date, end_date)
+        tasks, page = await asyncio.to_thread(
+            paginate,
+            "agenda",
+            lambda: _agenda_entries(
+                ctx, start, end, field, expand_repeats and view != "overdue", limit
+            ),
+            cursor,
+            max_bytes,
+            max_tokens,
+        )
+        return {
+            "success": True,
+            "view": view,
+            "field": field,
+            "from": format_date(max(start, 0)),
+            "to": format_date(end),
+            "count": len(tasks),
+            "tasks": tasks,
+            **page,
+        }
+    except Exception as e:
+        logger.error(f"Failed to get agenda: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e),
+        }
+
+
+def _agenda_entries(
+    ctx: AccountContext, start: int, end: int, field: str, expand_repeats: bool, limit: int
+) -> List[Dict[str, Any]]:
+    """Collect agenda entries for a window from the account's agenda index."""
+    ctx.task_cache.sync()
+    index = ctx.agenda_index
+    with ctx.task_cache.reading():
+        entries = [
+            (timestamp, task, False) for timestamp, task in index.range(field, start, end)
+        ]
+        if expand_repeats and field == "due":
+            repeats = index.occurrences(start, end)
+            entries += [(timestamp, task, True) for timestamp, task in repeats]
+    entries.sort(key=lambda entry: (entry[0], entry[1].id))
+
+    items = []
+    for timestamp, task, repeat in entries[:limit]:
+        item = task_summary(task)
+        item["date"] = format_date(timestamp)
+        if task.duetime:
+            item["duetime"] = task.duetime
+        if task.repeat:
+            item["repeat"] = task.repeat
+        if repeat:
+            item["occurrence"] = True
+        items.append(item)
+    return items
+
+
+async def get_changes_tool(
+    since: Optional[str] = None,
+    cursor: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Get tasks changed or deleted since a sync cursor."""
+    try:
+        ctx = current_account()
+        sync = {}
+
+        def fetch():
+            changes = get_changes(ctx.client, ctx.name, since)
+            sync["cursor"] = changes["cursor"]
+            sync["deleted"] = changes["deleted"]
+            return changes["changed"]
+
+        changed, page = await asyncio.to_thread(
+            paginate, "changes", fetch, cursor, max_bytes, max_tokens
+        )
+        result = {
+            "success": True,
+            "count": len(changed),
+            "changed": changed,
+            **page,
+        }
+        # The sync cursor and deletions come with the first page only
+        if not cursor:
+            result["sync_cursor"] = sync["cursor"]
+            result["deleted"] = sync["deleted"]
+        return result
+    except Exception as e:
+        logger.error(f"Failed to get changes: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e),
+        }
+
+
+async def export_tasks_tool(
+    path: str,
+    format: Optional[str] = None,
+    status: str = "all",
+    resume: bool = True,
+) -> Dict[str, Any]:
+    """Stream tasks to a file on disk."""
+    try:
+        ctx = current_account()
+        result = await asyncio.to_thread(
+            export_tasks,
+            ctx.client,
+            resolve_transfer_path(path, settings.transfer_dir),
+            file_format=format,
+            status=status,
+            workers=settings.max_concurrent_bulk,
+            resume=resume,
+            overwrite=False,
+        )
+        return {
+            "success": True,
+            **result,
+        }
+    except Exception as e:
+        logger.error(f"Failed to export tasks: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "Call export_tasks again with the same path to resume",
+        }
+
+
+async def import_tasks_tool(
+    path: str,
+    format: Optional[str] = None,
+    resume: bool = True,
+) -> Dict[str, Any]:
+    """Create tasks from a file on disk."""
+    try:
+        ctx = current_account()
+        result = await asyncio.to_thread(
+            import_tasks,
+            ctx.client,
+            resolve_transfer_path(path, settings.transfer_dir),
+            file_format=format,
+            workers=settings.max_concurrent_bulk,
+            resume=resume,
+        )
+        return {
+            "success": True,
+            **result,
+        }
+    except Exception as e:
+        logger.error(f"Failed to import tasks: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "Call import_tasks again with the same path to resume",
+        }
+
+
+async def get_request_metrics() -> Dict[str, Any]:
+    """Get request scheduler metrics for every loaded account."""
+    try:
+        return {
+            "success": True,
+            "accounts": {ctx.name: ctx.scheduler.metrics() for ctx in client_pool.active()},
+        }
+    except Exception as e:
+        logger.error(f"Failed to get request metrics: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e),
+        }
+
+
 async def health_check() -> Dict[str, Any]:
     """Check server health and authorization status."""
     try:
-        has_tokens = token_manager.has_tokens()
+        ctx = current_account()
+        has_tokens = ctx.token_manager.has_tokens()
 
         if not has_tokens:
-            auth_url = token_manager.get_authorization_url()
+            auth_url = ctx.token_manager.get_authorization_url()
             return {
                 "success": False,
                 "status": "needs_authorization",
@@ -354,7 +1010,7 @@ async def health_check() -> Dict[str, Any]:
             }
 
         # Try to get account info to verify token is valid
-        account = client.get_account_info()
+        account = await asyncio.to_thread(ctx.client.get_account_info)
         return {
             "success": True,
             "status": "ready",
@@ -374,8 +1030,9 @@ async def health_check() -> Dict[str, Any]:
 async def authorize_mcp(code: str) -> Dict[str, Any]:
     """Complete OAuth2 authorization with an authorization code."""
     try:
-        token_manager.exchange_code_for_tokens(code)
-        account = client.get_account_info()
+        ctx = current_account()
+        await asyncio.to_thread(ctx.token_manager.exchange_code_for_tokens, code)
+        account = await asyncio.to_thread(ctx.client.get_account_info)
         return {
             "success": True,
             "message": "Authorization successful",
@@ -404,33 +1061,56 @@ async def handle_list_tools() -> List[types.Tool]:
 @server.call_tool()
 async def handle_call_tool(name: str, arguments: dict) -> List[types.TextContent]:
     """Handle tool execution requests."""
-    logger.info(f"Calling tool: {name} with arguments: {arguments}")
-    
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(f"Calling tool: {name} with arguments: {summarize_arguments(arguments)}")
+    arguments = dict(arguments or {})
+    _current_account.set(arguments.pop("account", None) or DEFAULT_ACCOUNT)
+
     try:
-        # Route to appropriate tool function
-        if name == "get_tasks":
-            result = await get_tasks(**arguments)
-        elif name == "get_folders":
-            result = await get_folders()
-        elif name == "get_contexts":
-            result = await get_contexts()
-        elif name == "get_account_info":
-            result = await get_account_info()
-        elif name == "create_task":
-            result = await create_task(**arguments)
-        elif name == "get_goals":
-            result = await get_goals()
-        elif name == "get_locations":
-            result = await get_locations()
-        elif name == "health_check":
-            result = await health_check()
-        elif name == "authorize_mcp":
-            result = await authorize_mcp(**arguments)
+        # Route to appropriate tool function (background prefetching holds off meanwhile)
+        with prefetcher.interactive():
+            if name == "get_tasks":
+                result = await get_tasks(**arguments)
+            elif name == "get_folders":
+                result = await get_folders(**arguments)
+            elif name == "get_contexts":
+                result = await get_contexts(**arguments)
+            elif name == "get_account_info":
+                result = await get_account_info()
+            elif name == "create_task":
+                result = await create_task(**arguments)
+            elif name == "get_goals":
+                result = await get_goals(**arguments)
+            elif name == "get_locations":
+                result = await get_locations(**arguments)
+            elif name == "task_stats":
+                result = await task_stats(**arguments)
+            elif name == "get_task_tree":
+                result = await get_task_tree(**arguments)
+            elif name == "agenda":
+                result = await agenda(**arguments)
+            elif name == "get_changes":
+                result = await get_changes_tool(**arguments)
+            elif name == "export_tasks":
+                result = await export_tasks_tool(**arguments)
+            elif name == "import_tasks":
+                result = await import_tasks_tool(**arguments)
+            elif name == "get_request_metrics":
+                result = await get_request_metrics()
+            elif name == "health_check":
+                result = await health_check()
+            elif name == "authorize_mcp":
+                result = await authorize_mcp(**arguments)
+            else:
+                result = {"error": f"Unknown tool: {name}"}
+
+        # Return result as TextContent (paginated responses compactly, as their
+        # pages are sized in compact JSON)
+        if name in PAGINATED_TOOLS:
+            text = json.dumps(result, separators=(",", ":"))
         else:
-            result = {"error": f"Unknown tool: {name}"}
-        
-        # Return result as TextContent
-        return [types.TextContent(type="text", text=json.dumps(result, indent=2))]
+            text = json.dumps(result, indent=2)
+        return [types.TextContent(type="text", text=text)]
         
     except Exception as e:
         logger.error(f"Error calling tool {name}: {str(e)}", exc_info=True)
@@ -438,6 +1118,40 @@ async def handle_call_tool(name: str, arguments: dict) -> List[types.TextContent
         return [types.TextContent(type="text", text=json.dumps(error_result, indent=2))]
 
 
+@server.list_resources()
+async def handle_list_resources() -> List[types.Resource]:
+    """Return resources for every loaded account."""
+    accounts = [ctx.name for ctx in client_pool.active()] or [DEFAULT_ACCOUNT]
+    return list_resources(accounts)
+
+
+@server.read_resource()
+async def handle_read_resource(uri) -> str:
+    """Return the current contents of a resource as JSON."""
+    logger.info(f"Reading resource: {uri}")
+    account, name = parse_uri(uri)
+    ctx = client_pool.get(account)
+    contents = await asyncio.to_thread(read_resource, ctx, name)
+    return json.dumps(contents, indent=2)
+
+
+@server.subscribe_resource()
+async def handle_subscribe_resource(uri) -> None:
+    """Send resource-updated notifications for a resource to this session."""
+    logger.info(f"Subscribing to resource: {uri}")
+    account, _ = parse_uri(uri)
+    # Prime first so a failure (e.g. an unauthorized account) leaves no subscription
+    await resource_watcher.prime(account)
+    resource_watcher.subscribe(str(uri), server.request_context.session)
+
+
+@server.unsubscribe_resource()
+async def handle_unsubscribe_resource(uri) -> None:
+    """Stop notifications for a resource to this session."""
+    logger.info(f"Unsubscribing from resource: {uri}")
+    resource_watcher.unsubscribe(str(uri), server.request_context.session)
+
+
 # ============================================================================
 # Server Startup
 # ============================================================================
@@ -454,7 +1168,17 @@ async def main():
         async with stdio_server() as (read_stream, write_stream):
             logger.info("stdio server initialized, starting server...")
             init_options = server.create_initialization_options()
-            await server.run(read_stream, write_stream, init_options)
+            # The SDK does not advertise subscriptions on its own
+            if init_options.capabilities.resources is not None:
+                init_options.capabilities.resources.subscribe = True
+            background = [asyncio.create_task(resource_watcher.run())]
+            if settings.prefetch_enabled:
+                background.append(asyncio.create_task(prefetcher.run()))
+            try:
+                await server.run(read_stream, write_stream, init_options)
+            finally:
+                for task in background:
+                    task.cancel()
     except Exception as e:
         logger.error(f"Server error: {str(e)}", exc_info=True)
         raise
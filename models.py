@@ -0,0 +1,259 @@
+"""
+Task model for Toodledo API data
+Compact, slotted representation of tasks returned by the API
+"""
+
+import sys
+import zlib
+from enum import IntEnum
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class Priority(IntEnum):
+    """Toodledo task priority"""
+
+    NEGATIVE = -1
+    LOW = 0
+    MEDIUM = 1
+    HIGH = 2
+    TOP = 3
+
+
+class Status(IntEnum):
+    """Toodledo task status"""
+
+    NONE = 0
+    NEXT_ACTION = 1
+    ACTIVE = 2
+    PLANNING = 3
+    DELEGATED = 4
+    WAITING = 5
+    HOLD = 6
+    POSTPONED = 7
+    SOMEDAY = 8
+    CANCELED = 9
+    REFERENCE = 10
+
+
+# Optional fields requested from tasks/get.php (id, title, modified and completed
+# are always returned by the API)
+REQUESTED_FIELDS = (
+    "folder", "context", "goal", "location", "tag", "startdate", "duedate", "duedatemod",
+    "starttime", "duetime", "remind", "repeat", "status", "star", "priority", "length",
+    "timer", "added", "note", "parent", "children", "order", "meta", "previous",
+    "attachment", "shared", "addedby", "via", "attachments",
+)
+
+# Numeric fields stored as plain ints
+INT_FIELDS = (
+    "id", "modified", "completed", "folder", "context", "goal", "location", "startdate",
+    "duedate", "duedatemod", "starttime", "duetime", "remind", "star", "length", "timer",
+    "added", "parent", "children", "order", "previous", "attachment", "shared", "addedby",
+    "via",
+)
+
+# Free-text fields stored as-is
+STR_FIELDS = ("title", "tag", "meta")
+
+# Field order used when converting back to the wire format
+API_FIELDS = ("id", "title", "modified", "completed") + REQUESTED_FIELDS
+
+# Notes longer than this are kept zlib-compressed until accessed
+NOTE_COMPRESS_THRESHOLD = 512
+
+
+def _to_int(value: Any) -> Optional[int]:
+    """Coerce an API value to int, keeping missing values as None"""
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_enum(enum_cls, value: Any):
+    """Map an API value onto an enum member, falling back to the raw int"""
+    value = _to_int(value)
+    if value is None:
+        return None
+    try:
+        return enum_cls(value)
+    except ValueError:
+        return value
+
+
+class Task:
+    """
+    A single Toodledo task
+
+    Uses __slots__ instead of a per-instance dict, shares enum members for
+    priority/status, interns repeat rules and tags, and keeps notes encoded
+    until they are read.
+    """
+
+    __slots__ = INT_FIELDS + STR_FIELDS + (
+        "priority", "status", "repeat", "attachments", "_note", "_note_packed", "_extra",
+    )
+
+    def __init__(self, id: int, title: str = "", **fields: Any):
+        fields["id"] = id
+        fields["title"] = title
+        self._load(fields)
+
+    # ------------------------------------------------------------------
+    # Lazily decoded note
+    # ------------------------------------------------------------------
+
+    @property
+    def note(self) -> Optional[str]:
+        """Task note, decoded on access"""
+        raw = self._note
+        if raw is None:
+            return None
+        if self._note_packed:
+            raw = zlib.decompress(raw)
+        return raw.decode("utf-8")
+
+    @note.setter
+    def note(self, value: Optional[str]) -> None:
+        if not value:
+            self._note = None
+            self._note_packed = False
+            return
+        raw = value.encode("utf-8")
+        if len(raw) > NOTE_COMPRESS_THRESHOLD:
+            packed = zlib.compress(raw)
+            if len(packed) < len(raw):
+                self._note = packed
+                self._note_packed = True
+                return
+        self._note = raw
+        self._note_packed = False
+
+    @property
+    def has_note(self) -> bool:
+        """Check if the task has a note without decoding it"""
+        return self._note is not None
+
+    # ------------------------------------------------------------------
+    # Convenience accessors
+    # ------------------------------------------------------------------
+
+    @property
+    def is_completed(self) -> bool:
+        """Check if the task is completed"""
+        return bool(self.completed)
+
+    @property
+    def is_starred(self) -> bool:
+        """Check if the task is starred"""
+        return bool(self.star)
+
+    # ------------------------------------------------------------------
+    # Wire format conversion
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_api(cls, data: Dict[str, Any]) -> "Task":
+        """Build a Task from a task dict returned by the API"""
+        task = cls.__new__(cls)
+        task._load(data)
+        return task
+
+    def _load(self, data: Dict[str, Any]) -> None:
+        """Set every slot from API-style fields, normalising types"""
+        for name in _DEFAULTED_SLOTS:
+            setattr(self, name, None)
+        self.title = ""
+        self._note = None
+        self._note_packed = False
+        extra = None
+        for key, value in data.items():
+            if key in _INT_FIELD_SET:
+                setattr(self, key, _to_int(value))
+            elif key == "title":
+                self.title = value or ""
+            elif key == "tag":
+                self.tag = sys.intern(value) if value else None
+            elif key == "meta":
+                self.meta = value or None
+            elif key == "priority":
+                self.priority = _to_enum(Priority, value)
+            elif key == "status":
+                self.status = _to_enum(Status, value)
+            elif key == "repeat":
+                self.repeat = sys.intern(value) if value else None
+            elif key == "note":
+                self.note = value
+            elif key == "attachments":
+                self.attachments = value or None
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        self._extra = extra
+
+    def to_api(self, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Convert back to the API wire format
+
+        Args:
+            fields: Fields to include (default: all fields that are set)
+
+        Returns:
+            Task dict as used by tasks/get.php, tasks/add.php and tasks/edit.php
+        """
+        result: Dict[str, Any] = {}
+        for name in fields if fields is not None else API_FIELDS:
+            if name == "note":
+                value = self.note
+            elif name in _SLOT_SET:
+                value = getattr(self, name)
+            elif self._extra and name in self._extra:
+                value = self._extra[name]
+            else:
+                continue
+            if value is None:
+                continue
+            result[name] = int(value) if isinstance(value, IntEnum) else value
+        if fields is None and self._extra:
+            for name, value in self._extra.items():
+                result.setdefault(name, value)
+        return result
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Task):
+            return NotImplemented
+        return self.to_api() == other.to_api()
+
+    def __hash__(self) -> int:
+        # Equal tasks always share an id, so hashing by id is consistent with __eq__
+        return hash(self.id)
+
+    def __repr__(self) -> str:
+        return f"Task(id={self.id!r}, title={self.title!r})"
+
+
+_INT_FIELD_SET = frozenset(INT_FIELDS)
+_SLOT_SET = frozenset(Task.__slots__)
+_DEFAULTED_SLOTS = INT_FIELDS + ("tag", "meta", "priority", "status", "repeat", "attachments")
+
+
+def tasks_from_response(result: Any) -> List[Task]:
+    """
+    Parse a tasks/get.php response into Task objects
+
+    The API prefixes the task list with a {"num": ..., "total": ...} header
+    which is skipped here.
+    """
+    if not isinstance(result, list):
+        return []
+    return [Task.from_api(item) for item in result if isinstance(item, dict) and "id" in item]
+
+
+def tasks_to_api(tasks: Iterable[Task], fields: Optional[Iterable[str]] = None) -> List[Dict]:
+    """Convert Task objects back to API task dicts"""
+    if fields is not None:
+        fields = tuple(fields)
+    return [task.to_api(fields) for task in tasks]
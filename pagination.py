@@ -0,0 +1,136 @@
+"""
+Cursor pagination for tool responses
+Large result lists are held in a server-side snapshot and served in pages
+that fit a response size budget, addressed by opaque cursors
+"""
+
+import base64
+import json
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Rough bytes per token, used to turn a token budget into a byte budget
+BYTES_PER_TOKEN = 4
+
+
+def encode_cursor(snapshot_id: str, offset: int) -> str:
+    """Build an opaque cursor for a position in a snapshot"""
+    raw = f"{snapshot_id}:{offset}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Split a cursor into (snapshot id, offset)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        snapshot_id, offset = base64.urlsafe_b64decode(padded).decode("ascii").split(":")
+        return snapshot_id, int(offset)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def byte_budget(
+    max_bytes: Optional[int], max_tokens: Optional[int], default: int
+) -> int:
+    """Resolve the caller's byte or token budget (smallest wins)"""
+    budgets = [default]
+    if max_bytes:
+        budgets.append(int(max_bytes))
+    if max_tokens:
+        budgets.append(int(max_tokens) * BYTES_PER_TOKEN)
+    return max(min(budgets), 1)
+
+
+def page_end(items: List[Any], offset: int, budget: int) -> int:
+    """
+    Find where a page starting at offset must end to fit the budget
+
+    Item sizes are measured as compact JSON, the encoding paginated tool
+    responses are sent in; at least one item is always included so every
+    page makes progress.
+    """
+    used = 0
+    end = offset
+    while end < len(items):
+        size = len(json.dumps(items[end], separators=(",", ":"))) + 1
+        if end > offset and used + size > budget:
+            break
+        used += size
+        end += 1
+    return end
+
+
+class SnapshotStore:
+    """Bounded, expiring store of result lists awaiting further pages"""
+
+    def __init__(self, max_snapshots: int, ttl: int):
+        self.max_snapshots = max_snapshots
+        self.ttl = ttl
+        # Snapshot id -> (owner, created, items)
+        self._snapshots: "OrderedDict[str, Tuple[str, float, List[Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, owner: str, items: List[Any]) -> str:
+        """Store a result list and return its snapshot id"""
+        snapshot_id = secrets.token_hex(8)
+        with self._lock:
+            self._expire()
+            self._snapshots[snapshot_id] = (owner, time.monotonic(), items)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        return snapshot_id
+
+    def get(self, owner: str, snapshot_id: str) -> List[Any]:
+        """Get a stored result list"""
+        with self._lock:
+            self._expire()
+            entry = self._snapshots.get(snapshot_id)
+            if entry is None or entry[0] != owner:
+                raise ValueError("Cursor expired or not valid for this request; start over")
+            self._snapshots.move_to_end(snapshot_id)
+            return entry[2]
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.ttl
+        expired = [s for s, (_, created, _) in self._snapshots.items() if created < cutoff]
+        for snapshot_id in expired:
+            del self._snapshots[snapshot_id]
+
+    def paginate(
+        self,
+        owner: str,
+        fetch: Callable[[], List[Any]],
+        cursor: Optional[str],
+        budget: int,
+    ) -> Tuple[List[Any], Dict[str, Any]]:
+        """
+        Get one page of a result list
+
+        Args:
+            owner: Key tying cursors to the account and tool that created them
+            fetch: Produces the full result list (only called without a cursor)
+            cursor: Cursor from a previous page, if any
+            budget: Page size budget in bytes
+
+        Returns:
+            (page items, paging fields to merge into the tool response)
+        """
+        if cursor:
+            snapshot_id, offset = decode_cursor(cursor)
+            items = self.get(owner, snapshot_id)
+        else:
+            items = fetch()
+            if not isinstance(items, list):
+                return items, {}
+            snapshot_id, offset = None, 0
+
+        end = page_end(items, offset, budget)
+        info: Dict[str, Any] = {"total": len(items)}
+        if end < len(items):
+            if snapshot_id is None:
+                snapshot_id = self.put(owner, items)
+            info["next_cursor"] = encode_cursor(snapshot_id, end)
+        return items[offset:end], info
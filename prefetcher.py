@@ -0,0 +1,133 @@
+"""
+Idle-time prefetcher for Toodledo
+Warms lookup lists and the task cache, and refreshes tokens ahead of
+expiry, while no tool calls are running
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from client_pool import AccountContext, ClientPool
+from request_scheduler import BACKGROUND, set_priority
+
+logger = logging.getLogger(__name__)
+
+# Seconds between idle checks
+TICK = 0.5
+
+
+class Prefetcher:
+    """Background cache warmer that stays out of the way of tool calls"""
+
+    def __init__(self, pool: ClientPool):
+        self.pool = pool
+        self.settings = pool.settings
+        self.active_calls = 0
+        self.last_activity = time.monotonic()
+        # Account -> monotonic time of its last background sync
+        self.last_sync: Dict[str, float] = {}
+        # Account -> monotonic time before which it is left alone after a failure
+        self.retry_after: Dict[str, float] = {}
+
+    @contextmanager
+    def interactive(self) -> Iterator[None]:
+        """Mark a tool call as running so background work holds off"""
+        self.active_calls += 1
+        try:
+            yield
+        finally:
+            self.active_calls -= 1
+            self.last_activity = time.monotonic()
+
+    def should_yield(self) -> bool:
+        """Check if background work must pause for interactive traffic"""
+        if self.active_calls:
+            return True
+        return time.monotonic() - self.last_activity < self.settings.prefetch_idle_delay
+
+    def _has_budget(self, ctx: AccountContext) -> bool:
+        """Only use rate limit tokens beyond the interactive reserve"""
+        return ctx.rate_limiter.available >= self.settings.prefetch_rate_reserve + 1
+
+    def _pause_sync(self, ctx: AccountContext) -> bool:
+        """
+        Called between task pages (on the sync's worker thread)
+
+        Waits while the account's spare rate budget is used up, so a long
+        initial load keeps its progress but stays within the reserve.
+
+        Returns:
+            True if the sync must stop because a tool call arrived
+        """
+        while not self.should_yield():
+            if self._has_budget(ctx):
+                return False
+            time.sleep(TICK)
+        return True
+
+    async def warm(self, ctx: AccountContext) -> None:
+        """
+        Run one round of background work for an account
+
+        Each API call is a separate step; the round stops as soon as a tool
+        call arrives or the account's spare rate budget runs out.
+        """
+        if not ctx.token_manager.has_tokens():
+            return
+
+        if ctx.token_manager.seconds_until_expiry() < self.settings.token_refresh_margin:
+            if self.should_yield() or not self._has_budget(ctx):
+                return
+            logger.info(f"Refreshing token ahead of expiry for account '{ctx.name}'")
+            await asyncio.to_thread(
+                ctx.token_manager.refresh_access_token, self.settings.token_refresh_margin
+            )
+
+        due = self.last_sync.get(ctx.name, 0) + self.settings.prefetch_interval
+        if time.monotonic() < due:
+            return
+
+        if self.should_yield() or not self._has_budget(ctx):
+            return
+        account = await asyncio.to_thread(ctx.client.get_account_info)
+
+        for kind, marker in ctx.check_lookups(account).items():
+            if self.should_yield() or not self._has_budget(ctx):
+                return
+            await asyncio.to_thread(ctx.fetch_lookup, kind, marker)
+
+        if self.should_yield() or not self._has_budget(ctx):
+            return
+        # Syncs every task, not just incomplete ones: the same cache answers
+        # task_stats, subtask rollups and completed-task filters
+        result = await asyncio.to_thread(
+            ctx.task_cache.sync, account, lambda: self._pause_sync(ctx)
+        )
+        if result is None:
+            return
+        self.last_sync[ctx.name] = time.monotonic()
+        logger.info(f"Prefetched account '{ctx.name}': {result}")
+
+    async def run(self) -> None:
+        """Warm caches forever (run as a background task)"""
+        set_priority(BACKGROUND)
+        # Make sure the default account is loaded so it gets warmed at startup
+        self.pool.get()
+        while True:
+            await asyncio.sleep(TICK)
+            if self.should_yield():
+                continue
+            for ctx in self.pool.active():
+                if time.monotonic() < self.retry_after.get(ctx.name, 0):
+                    continue
+                try:
+                    await self.warm(ctx)
+                except Exception as e:
+                    logger.error(f"Prefetch failed for account '{ctx.name}': {str(e)}")
+                    # Back off a full interval before retrying this account
+                    self.retry_after[ctx.name] = time.monotonic() + self.settings.prefetch_interval
+                if self.should_yield():
+                    break
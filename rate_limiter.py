@@ -0,0 +1,44 @@
+"""
+Rate limiting for Toodledo API calls
+Token bucket shared by all requests made on behalf of one account
+"""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """Thread-safe token bucket rate limiter"""
+
+    def __init__(self, rate: float, burst: int):
+        """
+        Args:
+            rate: Requests allowed per second on average
+            burst: Maximum requests allowed back to back
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available, without waiting"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    @property
+    def available(self) -> float:
+        """Tokens currently available"""
+        with self._lock:
+            self._refill()
+            return self._tokens
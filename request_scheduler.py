@@ -0,0 +1,159 @@
+"""
+Priority-aware scheduling of Toodledo API requests
+Queues requests by priority class with per-class concurrency limits and
+weighted fair dispatch under an account's shared rate limit
+"""
+
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Optional
+
+from rate_limiter import RateLimiter
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+BULK = "bulk"
+
+PRIORITIES = (INTERACTIVE, BULK, BACKGROUND)
+
+# Relative share of dispatches each class gets while several are queued
+WEIGHTS = {INTERACTIVE: 10, BULK: 2, BACKGROUND: 1}
+
+# Priority class of requests made from the current thread/task
+_priority: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "request_priority", default=INTERACTIVE
+)
+
+
+def current_priority() -> str:
+    """Get the priority class requests are currently made with"""
+    return _priority.get()
+
+
+def set_priority(priority: str) -> None:
+    """Set the priority class for the rest of the current task"""
+    if priority not in WEIGHTS:
+        raise ValueError(f"Unknown request priority '{priority}'")
+    _priority.set(priority)
+
+
+@contextmanager
+def request_priority(priority: str) -> Iterator[None]:
+    """Make requests within the block with the given priority class"""
+    if priority not in WEIGHTS:
+        raise ValueError(f"Unknown request priority '{priority}'")
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class RequestScheduler:
+    """Dispatches queued requests by priority class"""
+
+    def __init__(self, rate_limiter: Optional[RateLimiter], limits: Dict[str, int]):
+        """
+        Args:
+            rate_limiter: Shared rate budget for all classes (None = unlimited)
+            limits: Maximum concurrent requests per priority class
+        """
+        self.rate_limiter = rate_limiter
+        self.limits = {priority: max(limits.get(priority, 1), 1) for priority in PRIORITIES}
+        self._cond = threading.Condition()
+        self._queues: Dict[str, Deque[object]] = {p: deque() for p in PRIORITIES}
+        self._in_flight = {p: 0 for p in PRIORITIES}
+        # Weighted fair queuing: each dispatch advances the class's virtual time
+        self._virtual = {p: 0.0 for p in PRIORITIES}
+        self._dispatched = {p: 0 for p in PRIORITIES}
+        self._wait_total = {p: 0.0 for p in PRIORITIES}
+        self._wait_max = {p: 0.0 for p in PRIORITIES}
+
+    def _next_class(self) -> Optional[str]:
+        """Pick the class whose head request should go next"""
+        eligible = [
+            p for p in PRIORITIES
+            if self._queues[p] and self._in_flight[p] < self.limits[p]
+        ]
+        if not eligible:
+            return None
+        return min(eligible, key=lambda p: (self._virtual[p], PRIORITIES.index(p)))
+
+    def _token_wait(self) -> float:
+        if self.rate_limiter is None:
+            return 0.0
+        return max((1 - self.rate_limiter.available) / self.rate_limiter.rate, 0.001)
+
+    def _acquire(self, priority: str) -> None:
+        waiter = object()
+        enqueued = time.monotonic()
+        with self._cond:
+            queue = self._queues[priority]
+            if not queue and self._in_flight[priority] == 0:
+                # A class returning from idle must not bank credit from its idle time
+                busy = [self._virtual[p] for p in PRIORITIES if self._queues[p]]
+                if busy:
+                    self._virtual[priority] = max(self._virtual[priority], min(busy))
+            queue.append(waiter)
+            while True:
+                chosen = self._next_class()
+                if chosen == priority and queue[0] is waiter:
+                    if self.rate_limiter is None or self.rate_limiter.try_acquire():
+                        break
+                    self._cond.wait(self._token_wait())
+                else:
+                    self._cond.wait(0.5)
+
+            queue.popleft()
+            self._in_flight[priority] += 1
+            self._virtual[priority] += 1.0 / WEIGHTS[priority]
+            waited = time.monotonic() - enqueued
+            self._dispatched[priority] += 1
+            self._wait_total[priority] += waited
+            self._wait_max[priority] = max(self._wait_max[priority], waited)
+            self._cond.notify_all()
+
+    def _release(self, priority: str) -> None:
+        with self._cond:
+            self._in_flight[priority] -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, priority: Optional[str] = None) -> Iterator[None]:
+        """
+        Wait for a request slot, then hold it for the duration of the block
+
+        Args:
+            priority: Priority class (default: current_priority())
+        """
+        priority = priority or current_priority()
+        if priority not in WEIGHTS:
+            raise ValueError(f"Unknown request priority '{priority}'")
+        self._acquire(priority)
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, concurrency and wait time per priority class"""
+        with self._cond:
+            classes = {}
+            for p in PRIORITIES:
+                dispatched = self._dispatched[p]
+                classes[p] = {
+                    "queued": len(self._queues[p]),
+                    "in_flight": self._in_flight[p],
+                    "limit": self.limits[p],
+                    "dispatched": dispatched,
+                    "avg_wait_ms": round(self._wait_total[p] / dispatched * 1000, 1)
+                    if dispatched else 0.0,
+                    "max_wait_ms": round(self._wait_max[p] * 1000, 1),
+                }
+        result: Dict[str, Any] = {"classes": classes}
+        if self.rate_limiter is not None:
+            result["rate_tokens_available"] = round(self.rate_limiter.available, 2)
+        return result
@@ -0,0 +1,219 @@
+"""
+MCP resources for Toodledo
+Publishes lookup lists and task views as resources and notifies subscribed
+clients when the account's lastedit markers show they actually changed
+"""
+
+import asyncio
+import logging
+from datetime import date
+from typing import Any, Dict, List, Set, Tuple
+from urllib.parse import urlparse
+
+import mcp.types as types
+
+from client_pool import DEFAULT_ACCOUNT, LOOKUP_MARKERS, AccountContext, ClientPool
+from request_scheduler import BACKGROUND, set_priority
+from task_table import format_date, parse_date
+
+logger = logging.getLogger(__name__)
+
+SCHEME = "toodledo"
+
+# Resource name -> description (lastedit markers are in LOOKUP_MARKERS)
+LOOKUP_RESOURCES = {
+    "folders": "Task folders",
+    "contexts": "Contexts (like @Work, @Home)",
+    "goals": "Goals",
+    "locations": "Locations",
+}
+
+# Resource name -> description
+TASK_VIEWS = {
+    "tasks/today": "Open tasks due today",
+    "tasks/overdue": "Open tasks past their due date",
+    "tasks/starred": "Open starred tasks",
+}
+
+# Account markers that affect task views
+TASK_MARKERS = ("lastedit_task", "lastdelete_task")
+
+# Task views that change when the date rolls over
+DATED_VIEWS = ("tasks/today", "tasks/overdue")
+
+
+def resource_uri(account: str, name: str) -> str:
+    """Build a resource URI, e.g. toodledo://default/folders"""
+    return f"{SCHEME}://{account}/{name}"
+
+
+def parse_uri(uri: str) -> Tuple[str, str]:
+    """Split a resource URI into (account, resource name)"""
+    parsed = urlparse(str(uri))
+    name = parsed.path.lstrip("/")
+    if parsed.scheme != SCHEME or (name not in LOOKUP_RESOURCES and name not in TASK_VIEWS):
+        raise ValueError(f"Unknown resource: {uri}")
+    return parsed.netloc or DEFAULT_ACCOUNT, name
+
+
+def list_resources(accounts: List[str]) -> List[types.Resource]:
+    """List the resources published for each account"""
+    resources = []
+    for account in accounts:
+        for name, description in LOOKUP_RESOURCES.items():
+            resources.append(
+                types.Resource(
+                    uri=resource_uri(account, name),
+                    name=f"{account}: {name}",
+                    description=description,
+                    mimeType="application/json",
+                )
+            )
+        for name, description in TASK_VIEWS.items():
+            resources.append(
+                types.Resource(
+                    uri=resource_uri(account, name),
+                    name=f"{account}: {name}",
+                    description=description,
+                    mimeType="application/json",
+                )
+            )
+    return resources
+
+
+def task_summary(task) -> Dict[str, Any]:
+    """Compact task fields shared by task view resources and the agenda tool"""
+    return {
+        "id": task.id,
+        "title": task.title,
+        "priority": int(task.priority or 0),
+        "star": bool(task.star),
+        "folder": task.folder or 0,
+        "context": task.context or 0,
+    }
+
+
+def _task_view_item(task) -> Dict[str, Any]:
+    item = task_summary(task)
+    if task.duedate:
+        item["duedate"] = format_date(task.duedate)
+    return item
+
+
+def read_resource(ctx: AccountContext, name: str) -> Any:
+    """Get the current contents of a resource (blocking)"""
+    if name in LOOKUP_RESOURCES:
+        return ctx.lookup(name)
+
+    ctx.task_cache.sync()
+    if name == "tasks/starred":
+        tasks = [t for t in ctx.task_cache.all() if t.star and not t.completed]
+        tasks.sort(key=lambda t: (-(t.priority or 0), t.duedate or 0, t.id))
+        return [_task_view_item(task) for task in tasks]
+
+    today = parse_date(date.today().isoformat())
+    with ctx.task_cache.reading():
+        if name == "tasks/today":
+            entries = ctx.agenda_index.range("due", today, today + 86399)
+        else:
+            entries = ctx.agenda_index.range("due", 1, today - 1)
+    return [_task_view_item(task) for _, task in entries]
+
+
+class ResourceWatcher:
+    """Polls account markers and sends resource-updated notifications"""
+
+    def __init__(self, pool: ClientPool, interval: int):
+        self.pool = pool
+        self.interval = interval
+        # URI -> subscribed sessions
+        self.subscriptions: Dict[str, Set[Any]] = {}
+        # Account -> last seen markers
+        self.markers: Dict[str, Dict[str, int]] = {}
+        self.today = date.today()
+
+    def subscribe(self, uri: str, session: Any) -> None:
+        """Register a session for updates to a resource"""
+        parse_uri(uri)
+        self.subscriptions.setdefault(str(uri), set()).add(session)
+
+    async def prime(self, account: str) -> None:
+        """Record an account's current markers so the next change is detected"""
+        if account in self.markers:
+            return
+        ctx = self.pool.get(account)
+        info = await asyncio.to_thread(ctx.client.get_account_info)
+        self._changed(account, info)
+
+    def unsubscribe(self, uri: str, session: Any) -> None:
+        """Stop sending updates for a resource to a session"""
+        sessions = self.subscriptions.get(str(uri))
+        if sessions is not None:
+            sessions.discard(session)
+            if not sessions:
+                del self.subscriptions[str(uri)]
+
+    def _changed(self, account: str, info: Dict[str, Any]) -> Set[str]:
+        """Compare account markers with the last seen values"""
+        current = {
+            marker: int(info.get(marker) or 0)
+            for marker in list(LOOKUP_MARKERS.values()) + list(TASK_MARKERS)
+        }
+        previous = self.markers.get(account)
+        self.markers[account] = current
+        if previous is None:
+            return set()
+
+        changed = {
+            name
+            for name, marker in LOOKUP_MARKERS.items()
+            if current[marker] != previous[marker]
+        }
+        if any(current[m] != previous[m] for m in TASK_MARKERS):
+            changed.update(TASK_VIEWS)
+        return changed
+
+    async def check(self) -> None:
+        """Poll every subscribed account once and notify on changes"""
+        rolled_over = date.today() != self.today
+        self.today = date.today()
+
+        accounts: Dict[str, List[str]] = {}
+        for uri in self.subscriptions:
+            account, name = parse_uri(uri)
+            accounts.setdefault(account, []).append(name)
+
+        for account, names in accounts.items():
+            try:
+                ctx = self.pool.get(account)
+                info = await asyncio.to_thread(ctx.client.get_account_info)
+                changed = self._changed(account, info)
+                # Drop cached lookup lists whose markers moved
+                ctx.check_lookups(info)
+                if changed & set(TASK_VIEWS):
+                    # Reuse the markers we just fetched to sync the task cache
+                    await asyncio.to_thread(ctx.task_cache.sync, info)
+                if rolled_over:
+                    changed.update(DATED_VIEWS)
+            except Exception as e:
+                logger.error(f"Resource watcher failed for account '{account}': {str(e)}")
+                continue
+
+            for name in changed & set(names):
+                await self._notify(resource_uri(account, name))
+
+    async def _notify(self, uri: str) -> None:
+        for session in list(self.subscriptions.get(uri, ())):
+            try:
+                await session.send_resource_updated(uri)
+            except Exception as e:
+                logger.info(f"Dropping subscription to {uri}: {str(e)}")
+                self.unsubscribe(uri, session)
+
+    async def run(self) -> None:
+        """Poll forever (run as a background task)"""
+        set_priority(BACKGROUND)
+        while True:
+            await asyncio.sleep(self.interval)
+            if self.subscriptions:
+                await self.check()
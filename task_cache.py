@@ -0,0 +1,176 @@
+"""
+In-memory task cache for Toodledo
+Keeps a resident copy of all tasks, synced incrementally using the
+account's lastedit/lastdelete markers
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from changes import RECHECK_WINDOW
+from models import Task
+
+logger = logging.getLogger(__name__)
+
+
+class TaskCache:
+    """Resident copy of all tasks in an account"""
+
+    def __init__(self, client):
+        self.client = client
+        self.tasks: Dict[int, Task] = {}
+        self.last_edit = 0
+        self.last_delete = 0
+        self.synced = False
+        # Time the current markers were read, to detect same-second edits
+        self.synced_at = 0
+        # Bumped on every change so derived structures know when to rebuild
+        self.version = 0
+        self._indexes: List[Any] = []
+        self._lock = threading.RLock()
+
+    def add_index(self, index) -> None:
+        """
+        Register an index to keep in step with the cache
+
+        Indexes implement rebuild(tasks), upsert(task, previous) and
+        remove(previous), and are updated incrementally as tasks change.
+        """
+        with self._lock:
+            self._indexes.append(index)
+            if self.synced:
+                index.rebuild(self.tasks.values())
+
+    def sync(
+        self,
+        account: Optional[Dict[str, Any]] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+    ) -> Optional[Dict[str, int]]:
+        """
+        Bring the cache up to date with Toodledo
+
+        The first call fetches every task; later calls only fetch tasks
+        edited or deleted since the previous sync. Pages are fetched without
+        holding the cache lock, so readers and other syncs are never blocked
+        on the network; results are applied only if no newer sync got there
+        first. A sync shortly after the markers' own second re-reads that
+        second, since Toodledo's `after` filters would otherwise skip edits
+        made in it (see changes.RECHECK_WINDOW).
+
+        Args:
+            account: Result of get_account_info, if the caller already has it
+            should_stop: Checked between pages; returning True abandons the sync
+
+        Returns:
+            Counts of tasks added/updated and removed, or None if stopped
+        """
+        now = int(time.time())
+        if account is None:
+            account = self.client.get_account_info()
+        last_edit = int(account.get("lastedit_task") or 0)
+        last_delete = int(account.get("lastdelete_task") or 0)
+        with self._lock:
+            synced, since_edit, since_delete = self.synced, self.last_edit, self.last_delete
+            synced_at = self.synced_at
+
+        if not synced:
+            tasks = self._fetch_tasks({}, should_stop)
+            if tasks is None:
+                return None
+            with self._lock:
+                if self.synced:
+                    # Another sync finished the initial load first
+                    return {"updated": 0, "removed": 0}
+                self.tasks = {task.id: task for task in tasks}
+                self.last_edit = last_edit
+                self.last_delete = last_delete
+                self.synced_at = now
+                self.synced = True
+                self.version += 1
+                for index in self._indexes:
+                    index.rebuild(self.tasks.values())
+            logger.info(f"Task cache loaded {len(tasks)} tasks")
+            return {"updated": len(tasks), "removed": 0}
+
+        updated: List[Task] = []
+        removed: List[int] = []
+        # `after` is exclusive, so read from one second before the markers
+        if last_edit > since_edit or synced_at - since_edit < RECHECK_WINDOW:
+            updated = self._fetch_tasks({"after": max(since_edit - 1, 0)}, should_stop)
+            if updated is None:
+                return None
+        if last_delete > since_delete or synced_at - since_delete < RECHECK_WINDOW:
+            if should_stop is not None and should_stop():
+                return None
+            deleted = self.client.get_deleted_tasks(after=max(since_delete - 1, 0))
+            removed = [int(item["id"]) for item in deleted]
+
+        with self._lock:
+            # Drop results older than what a concurrent sync already applied
+            if last_edit < self.last_edit:
+                updated = []
+            if last_delete < self.last_delete:
+                removed = []
+            # Re-read tasks that did not change are not updates
+            updated = [task for task in updated if self.tasks.get(task.id) != task]
+            removed = [task_id for task_id in removed if task_id in self.tasks]
+            self.apply(updated, removed)
+            self.synced_at = max(self.synced_at, now)
+            self.last_edit = max(self.last_edit, last_edit)
+            self.last_delete = max(self.last_delete, last_delete)
+        return {"updated": len(updated), "removed": len(removed)}
+
+    def _fetch_tasks(
+        self, filters: Dict[str, Any], should_stop: Optional[Callable[[], bool]]
+    ) -> Optional[List[Task]]:
+        """Fetch task pages, or None if should_stop() fires between pages"""
+        tasks: List[Task] = []
+        for page in self.client.iter_task_pages(**filters):
+            tasks.extend(page)
+            if should_stop is not None and should_stop():
+                return None
+        return tasks
+
+    def apply(self, updated: List[Task], removed: List[int]) -> None:
+        """Apply task edits and deletions to the cache"""
+        if not updated and not removed:
+            return
+        with self._lock:
+            for task in updated:
+                previous = self.tasks.get(task.id)
+                self.tasks[task.id] = task
+                for index in self._indexes:
+                    index.upsert(task, previous)
+            for task_id in removed:
+                previous = self.tasks.pop(task_id, None)
+                if previous is not None:
+                    for index in self._indexes:
+                        index.remove(previous)
+            self.version += 1
+            logger.info(f"Task cache applied {len(updated)} updates, {len(removed)} removals")
+
+    @contextmanager
+    def reading(self) -> Iterator[None]:
+        """
+        Hold the cache lock while querying registered indexes
+
+        Indexes are changed in place by syncs on other threads, so every
+        index query must run inside this block.
+        """
+        with self._lock:
+            yield
+
+    def all(self) -> List[Task]:
+        """Get a snapshot of all cached tasks"""
+        with self._lock:
+            return list(self.tasks.values())
+
+    def get(self, task_id: int) -> Optional[Task]:
+        """Get a cached task by ID"""
+        return self.tasks.get(task_id)
+
+    def __len__(self) -> int:
+        return len(self.tasks)
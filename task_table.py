@@ -0,0 +1,276 @@
+"""
+Columnar task table for aggregate queries
+Stores task attributes in typed arrays so group-by/count/sum/histogram
+queries run over tens of thousands of tasks without touching Task objects
+"""
+
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from models import Task
+
+# Column name -> array typecode
+COLUMNS = {
+    "id": "q",
+    "folder": "q",
+    "context": "q",
+    "goal": "q",
+    "location": "q",
+    "priority": "b",
+    "status": "b",
+    "star": "b",
+    "completed": "q",
+    "duedate": "q",
+    "startdate": "q",
+    "modified": "q",
+    "length": "l",
+}
+
+# Columns holding unix timestamps (0 = not set)
+DATE_COLUMNS = ("completed", "duedate", "startdate", "modified")
+
+# Columns that may be used as group-by keys
+GROUP_COLUMNS = ("folder", "context", "goal", "location", "priority", "status", "star")
+
+# Columns that may be summed
+SUM_COLUMNS = ("length",)
+
+# Named histogram bucket widths for date columns
+DATE_BUCKETS = {"day": 86400, "week": 7 * 86400}
+
+# 1969-12-29 (a Monday), so week buckets start on Mondays
+_WEEK_ORIGIN = -3 * 86400
+
+OPERATIONS = ("count", "sum", "histogram")
+
+
+def parse_date(value: str, end_of_day: bool = False) -> int:
+    """Convert YYYY-MM-DD to a UTC timestamp (start or end of that day)"""
+    day = datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    timestamp = int(day.timestamp())
+    return timestamp + 86399 if end_of_day else timestamp
+
+
+def format_date(timestamp: int) -> str:
+    """Convert a UTC timestamp to YYYY-MM-DD"""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+class TaskTable:
+    """Column-oriented snapshot of a task list"""
+
+    def __init__(self):
+        self.columns: Dict[str, array] = {name: array(code) for name, code in COLUMNS.items()}
+
+    @classmethod
+    def from_tasks(cls, tasks: Iterable[Task]) -> "TaskTable":
+        """Build a table from Task objects"""
+        table = cls()
+        appenders = [(name, table.columns[name].append) for name in COLUMNS]
+        for task in tasks:
+            for name, append in appenders:
+                append(int(getattr(task, name) or 0))
+        return table
+
+    def __len__(self) -> int:
+        return len(self.columns["id"])
+
+    # ------------------------------------------------------------------
+    # Filtering
+    # ------------------------------------------------------------------
+
+    def select(self, filters: Optional[Dict[str, Any]] = None) -> Sequence[int]:
+        """
+        Get row indices matching filters
+
+        Args:
+            filters: Optional keys:
+                completed: true=completed only, false=incomplete only
+                starred: true=starred only
+                folder, context, goal, location, status: exact ID match
+                priority_min: minimum priority
+                due_from, due_to: due date range (YYYY-MM-DD, inclusive)
+
+        Returns:
+            Matching row indices
+        """
+        rows: Sequence[int] = range(len(self))
+        if not filters:
+            return rows
+
+        cols = self.columns
+        predicates = []
+        if filters.get("completed") is not None:
+            completed = cols["completed"]
+            if filters["completed"]:
+                predicates.append(lambda i: completed[i] != 0)
+            else:
+                predicates.append(lambda i: completed[i] == 0)
+        if filters.get("starred"):
+            star = cols["star"]
+            predicates.append(lambda i: star[i] != 0)
+        for name in ("folder", "context", "goal", "location", "status"):
+            if filters.get(name) is not None:
+                column, wanted = cols[name], int(filters[name])
+                predicates.append(lambda i, c=column, w=wanted: c[i] == w)
+        if filters.get("priority_min") is not None:
+            priority, minimum = cols["priority"], int(filters["priority_min"])
+            predicates.append(lambda i: priority[i] >= minimum)
+        if filters.get("due_from") or filters.get("due_to"):
+            duedate = cols["duedate"]
+            low = parse_date(filters["due_from"]) if filters.get("due_from") else 1
+            high = parse_date(filters["due_to"], end_of_day=True) if filters.get("due_to") else None
+            if high is None:
+                predicates.append(lambda i: duedate[i] >= low)
+            else:
+                predicates.append(lambda i: low <= duedate[i] <= high)
+
+        for predicate in predicates:
+            rows = [i for i in rows if predicate(i)]
+        return rows
+
+    # ------------------------------------------------------------------
+    # Aggregates
+    # ------------------------------------------------------------------
+
+    def _group_keys(self, group_by: Sequence[str]) -> List[array]:
+        for name in group_by:
+            if name not in GROUP_COLUMNS:
+                raise ValueError(
+                    f"Cannot group by '{name}'. Use one of: {', '.join(GROUP_COLUMNS)}"
+                )
+        return [self.columns[name] for name in group_by]
+
+    def count(
+        self, group_by: Sequence[str] = (), filters: Optional[Dict[str, Any]] = None
+    ) -> Dict[Tuple[int, ...], int]:
+        """Count rows per group"""
+        keys = self._group_keys(group_by)
+        rows = self.select(filters)
+        if not keys:
+            return {(): len(rows)}
+        counts: Dict[Tuple[int, ...], int] = {}
+        for i in rows:
+            key = tuple(column[i] for column in keys)
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def sum(
+        self,
+        column: str,
+        group_by: Sequence[str] = (),
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> Dict[Tuple[int, ...], int]:
+        """Sum a numeric column per group"""
+        if column not in SUM_COLUMNS:
+            raise ValueError(f"Cannot sum '{column}'. Use one of: {', '.join(SUM_COLUMNS)}")
+        values = self.columns[column]
+        keys = self._group_keys(group_by)
+        totals: Dict[Tuple[int, ...], int] = {}
+        for i in self.select(filters):
+            key = tuple(c[i] for c in keys)
+            totals[key] = totals.get(key, 0) + values[i]
+        return totals
+
+    def histogram(
+        self,
+        column: str,
+        bucket: Any = None,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Dict[int, int], int]:
+        """
+        Bucket a column's values
+
+        Args:
+            column: Column to bucket
+            bucket: Bucket width; "day" or "week" for date columns
+            filters: Row filters (see select)
+
+        Returns:
+            (bucket start -> count, number of rows with no value for date columns)
+        """
+        if column not in COLUMNS or column == "id":
+            raise ValueError(f"Unknown histogram column '{column}'")
+        is_date = column in DATE_COLUMNS
+        origin = 0
+        if is_date:
+            bucket = bucket or "day"
+            if bucket not in DATE_BUCKETS:
+                raise ValueError(f"Date bucket must be one of: {', '.join(DATE_BUCKETS)}")
+            origin = _WEEK_ORIGIN if bucket == "week" else 0
+            width = DATE_BUCKETS[bucket]
+        else:
+            try:
+                width = int(bucket or 1)
+            except (TypeError, ValueError):
+                raise ValueError(
+                    f"Bucket for '{column}' must be a positive number; "
+                    f"named buckets ({', '.join(DATE_BUCKETS)}) only apply to date columns"
+                )
+            if width < 1:
+                raise ValueError("Bucket width must be positive")
+
+        values = self.columns[column]
+        counts: Dict[int, int] = {}
+        missing = 0
+        for i in self.select(filters):
+            value = values[i]
+            if is_date and value == 0:
+                missing += 1
+                continue
+            start = (value - origin) // width * width + origin
+            counts[start] = counts.get(start, 0) + 1
+        return counts, missing
+
+    def query(
+        self,
+        operation: str,
+        group_by: Sequence[str] = (),
+        column: Optional[str] = None,
+        bucket: Any = None,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run an aggregate and format it for a tool response
+
+        Args:
+            operation: count, sum or histogram
+            group_by: Group-by columns (count/sum)
+            column: Column to sum or bucket
+            bucket: Histogram bucket width
+            filters: Row filters (see select)
+
+        Returns:
+            Compact result with one row per group or bucket
+        """
+        if operation == "count":
+            groups = self.count(group_by, filters)
+        elif operation == "sum":
+            groups = self.sum(column or "length", group_by, filters)
+        elif operation == "histogram":
+            if not column:
+                raise ValueError("histogram requires a column")
+            counts, missing = self.histogram(column, bucket, filters)
+            is_date = column in DATE_COLUMNS
+            rows = [
+                {"bucket": format_date(start) if is_date else start, "count": count}
+                for start, count in sorted(counts.items())
+            ]
+            result: Dict[str, Any] = {"operation": operation, "column": column, "rows": rows}
+            if is_date:
+                result["no_value"] = missing
+            return result
+        else:
+            raise ValueError(
+                f"Unknown operation '{operation}'. Use one of: {', '.join(OPERATIONS)}"
+            )
+
+        rows = [
+            dict(zip(group_by, key), value=value)
+            for key, value in sorted(groups.items(), key=lambda item: -item[1])
+        ]
+        result = {"operation": operation, "group_by": list(group_by), "rows": rows}
+        if operation == "sum":
+            result["column"] = column or "length"
+        return result
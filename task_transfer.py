@@ -0,0 +1,356 @@
+"""
+Bulk task export and import for Toodledo
+Streams tasks between the API and NDJSON/CSV files with bounded memory,
+fetching export pages in parallel, importing in batches of 50 and
+recording progress so interrupted transfers can resume
+"""
+
+import csv
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from models import API_FIELDS
+from request_scheduler import BULK, request_priority
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("ndjson", "csv")
+
+# Tasks per tasks/get.php page and per tasks/add.php batch
+PAGE_SIZE = 1000
+BATCH_SIZE = 50
+
+# Fields tasks/add.php accepts; everything else is assigned by Toodledo
+IMPORT_FIELDS = (
+    "title", "folder", "context", "goal", "location", "priority", "status", "star",
+    "length", "remind", "starttime", "duetime", "completed", "duedatemod", "repeat",
+    "tag", "duedate", "startdate", "note", "meta",
+)
+
+# Numeric fields converted back from CSV strings on import
+_INT_IMPORT_FIELDS = frozenset(IMPORT_FIELDS) - {"title", "repeat", "tag", "note", "meta"}
+
+_STATUS_MAP = {"incomplete": 0, "complete": 1, "all": None}
+
+
+def detect_format(path: str, file_format: Optional[str] = None) -> str:
+    """Resolve the file format from an explicit value or the file extension"""
+    if file_format:
+        file_format = file_format.lower()
+    elif Path(path).suffix.lower() == ".csv":
+        file_format = "csv"
+    else:
+        file_format = "ndjson"
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown format '{file_format}'. Use one of: {', '.join(FORMATS)}")
+    return file_format
+
+
+def resolve_transfer_path(path: str, directory: str) -> str:
+    """
+    Resolve a path inside a transfer directory
+
+    Relative paths are taken relative to the directory; anything resolving
+    outside it (absolute paths, "..", symlinks) is refused.
+    """
+    base = Path(directory).expanduser().resolve()
+    target = (base / path).resolve()
+    if target == base or not target.is_relative_to(base):
+        raise ValueError(f"Path must be a file inside the transfer directory {base}")
+    return str(target)
+
+
+def _progress_path(path: Path) -> Path:
+    return path.with_name(path.name + ".progress")
+
+
+def _load_progress(path: Path) -> Optional[Dict[str, Any]]:
+    progress_path = _progress_path(path)
+    if not progress_path.exists():
+        return None
+    with open(progress_path, "r") as f:
+        return json.load(f)
+
+
+def _save_progress(path: Path, progress: Dict[str, Any]) -> None:
+    progress_path = _progress_path(path)
+    temp_path = progress_path.with_name(progress_path.name + ".tmp")
+    with open(temp_path, "w") as f:
+        json.dump(progress, f)
+    os.replace(temp_path, progress_path)
+
+
+def _clear_progress(path: Path) -> None:
+    _progress_path(path).unlink(missing_ok=True)
+
+
+def _csv_value(value: Any) -> Any:
+    return json.dumps(value) if isinstance(value, (list, dict)) else value
+
+
+# ============================================================================
+# Export
+# ============================================================================
+
+def export_tasks(
+    client,
+    path: str,
+    file_format: Optional[str] = None,
+    status: str = "all",
+    workers: int = 2,
+    resume: bool = True,
+    overwrite: bool = True,
+) -> Dict[str, Any]:
+    """
+    Export tasks to an NDJSON or CSV file
+
+    Pages are fetched `workers` at a time and written in order, so memory
+    stays bounded by the pages in flight. Progress is saved after every
+    page; with resume=True an interrupted export continues where it stopped.
+
+    Args:
+        client: ToodledoClient
+        path: Output file path
+        file_format: ndjson or csv (default: from the file extension)
+        status: incomplete, complete or all
+        workers: Pages fetched in parallel
+        resume: Continue a previous interrupted export to the same path
+        overwrite: Replace an existing file that is not an interrupted export
+
+    Returns:
+        Summary with the number of tasks written
+    """
+    output = Path(path).expanduser()
+    file_format = detect_format(path, file_format)
+    if status not in _STATUS_MAP:
+        raise ValueError(f"Unknown status '{status}'. Use one of: {', '.join(_STATUS_MAP)}")
+    completed = _STATUS_MAP[status]
+
+    progress = _load_progress(output) if resume else None
+    if progress and (progress.get("format") != file_format or progress.get("status") != status):
+        raise ValueError("Existing export progress uses different options; pass resume=false")
+    if not overwrite and output.exists() and not _progress_path(output).exists():
+        raise ValueError(f"{output} already exists; choose a new path")
+
+    def fetch(start: int) -> List[Dict[str, Any]]:
+        with request_priority(BULK):
+            result = client.get_tasks(completed=completed, start=start, num=PAGE_SIZE)
+        if not isinstance(result, list):
+            raise ValueError(f"Unexpected response: {result}")
+        return result
+
+    if progress:
+        start, total, written = progress["next_start"], progress["total"], progress["written"]
+        handle = open(output, "r+", newline="", encoding="utf-8")
+        handle.truncate(progress["offset"])
+        handle.seek(progress["offset"])
+        first_page = None
+        logger.info(f"Resuming export to {output} at task {start} of {total}")
+    else:
+        first = fetch(0)
+        total = int(first[0].get("total", 0)) if first and "total" in first[0] else 0
+        first_page = [item for item in first if "id" in item]
+        start, written = 0, 0
+        output.parent.mkdir(parents=True, exist_ok=True)
+        handle = open(output, "w", newline="", encoding="utf-8")
+
+    writer = None
+    if file_format == "csv":
+        writer = csv.DictWriter(handle, fieldnames=API_FIELDS, extrasaction="ignore")
+        if start == 0:
+            writer.writeheader()
+
+    def write_page(tasks: List[Dict[str, Any]]) -> None:
+        nonlocal written, start
+        for task in tasks:
+            if writer is not None:
+                writer.writerow({key: _csv_value(value) for key, value in task.items()})
+            else:
+                handle.write(json.dumps(task, separators=(",", ":")) + "\n")
+        written += len(tasks)
+        start += PAGE_SIZE
+        handle.flush()
+        _save_progress(output, {
+            "format": file_format,
+            "status": status,
+            "next_start": start,
+            "total": total,
+            "written": written,
+            "offset": handle.tell(),
+        })
+
+    try:
+        if first_page is not None:
+            write_page(first_page)
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            while start < total:
+                starts = list(range(start, total, PAGE_SIZE))[: max(workers, 1)]
+                for page in executor.map(fetch, starts):
+                    write_page([item for item in page if "id" in item])
+    finally:
+        handle.close()
+
+    _clear_progress(output)
+    logger.info(f"Exported {written} tasks to {output}")
+    return {"path": str(output), "format": file_format, "exported": written, "total": total}
+
+
+# ============================================================================
+# Import
+# ============================================================================
+
+def _read_records(path: Path, file_format: str) -> Iterator[Dict[str, Any]]:
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        if file_format == "csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _import_record(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Keep only the fields tasks/add.php accepts, typed as the API expects"""
+    task: Dict[str, Any] = {}
+    for key in IMPORT_FIELDS:
+        value = record.get(key)
+        if value is None or value == "":
+            continue
+        if key in _INT_IMPORT_FIELDS:
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                continue
+        task[key] = value
+    return task if task.get("title") else None
+
+
+def import_tasks(
+    client,
+    path: str,
+    file_format: Optional[str] = None,
+    workers: int = 2,
+    resume: bool = True,
+) -> Dict[str, Any]:
+    """
+    Import tasks from an NDJSON or CSV file
+
+    Records are read lazily and created 50 at a time, with up to `workers`
+    batches in flight. Progress is saved after every group of batches,
+    recording each batch that was created; with resume=True an import that
+    stopped on an error skips exactly those records. If the process is killed
+    after Toodledo created a batch but before progress was saved, that batch
+    is created again on resume.
+
+    Args:
+        client: ToodledoClient
+        path: Input file path
+        file_format: ndjson or csv (default: from the file extension)
+        workers: Batches sent in parallel
+        resume: Continue a previous interrupted import of the same file
+
+    Returns:
+        Summary with the number of tasks created, failed and skipped
+    """
+    source = Path(path).expanduser()
+    file_format = detect_format(path, file_format)
+    progress = (_load_progress(source) if resume else None) or {}
+    # Records 1..done are handled; `finished` holds [first, last] record ranges
+    # beyond that whose batches were created
+    done = progress.get("records", 0)
+    finished: List[List[int]] = progress.get("finished", [])
+    created, failed, skipped = (progress.get(k, 0) for k in ("created", "failed", "skipped"))
+    if done or finished:
+        logger.info(f"Resuming import from {source} after {done} records")
+
+    def send(batch: List[Dict[str, Any]]) -> List[Any]:
+        if not batch:
+            return []
+        with request_priority(BULK):
+            result = client.create_tasks_batch(batch)
+        return result if isinstance(result, list) else [result]
+
+    def flush(batches: List[Tuple[int, int, int, List[Dict[str, Any]]]]) -> None:
+        nonlocal created, failed, skipped, done
+        futures = [
+            (first, last, batch_skipped, executor.submit(send, batch))
+            for first, last, batch_skipped, batch in batches
+        ]
+        error: Optional[Exception] = None
+        for first, last, batch_skipped, future in futures:
+            try:
+                results = future.result()
+            except Exception as e:
+                error = error or e
+                continue
+            for item in results:
+                if isinstance(item, dict) and "id" in item:
+                    created += 1
+                else:
+                    failed += 1
+            skipped += batch_skipped
+            finished.append([first, last])
+        # Advance past finished ranges that directly follow the handled records
+        finished.sort()
+        while finished and finished[0][0] == done + 1:
+            done = finished.pop(0)[1]
+        _save_progress(source, {
+            "records": done,
+            "finished": finished,
+            "created": created,
+            "failed": failed,
+            "skipped": skipped,
+        })
+        if error is not None:
+            raise error
+
+    workers = max(workers, 1)
+    batches: List[Tuple[int, int, int, List[Dict[str, Any]]]] = []
+    batch: List[Dict[str, Any]] = []
+    first: Optional[int] = None
+    batch_skipped = 0
+
+    def close(last: int) -> None:
+        """End the current batch at record `last`, sending a group when full"""
+        nonlocal batches, batch, first, batch_skipped
+        batches.append((first, last, batch_skipped, batch))
+        batch, first, batch_skipped = [], None, 0
+        if len(batches) == workers:
+            flush(batches)
+            batches = []
+
+    index = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for index, record in enumerate(_read_records(source, file_format), start=1):
+            if index <= done or any(low <= index <= high for low, high in finished):
+                # Batches must cover contiguous records, so stop at imported ones
+                if first is not None:
+                    close(index - 1)
+                continue
+            if first is None:
+                first = index
+            task = _import_record(record)
+            if task is None:
+                batch_skipped += 1
+            else:
+                batch.append(task)
+            if len(batch) == BATCH_SIZE:
+                close(index)
+        if first is not None:
+            close(index)
+        if batches:
+            flush(batches)
+
+    _clear_progress(source)
+    logger.info(f"Imported {created} tasks from {source} ({failed} failed, {skipped} skipped)")
+    return {
+        "path": str(source),
+        "format": file_format,
+        "created": created,
+        "failed": failed,
+        "skipped": skipped,
+    }
@@ -0,0 +1,133 @@
+"""
+Subtask index for Toodledo tasks
+Adjacency index over the parent/children/order task fields, kept up to
+date incrementally by the task cache
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from models import Task
+
+
+class TaskTree:
+    """Parent -> children index over cached tasks"""
+
+    def __init__(self):
+        self.tasks: Dict[int, Task] = {}
+        self.children: Dict[int, Set[int]] = {}
+
+    # ------------------------------------------------------------------
+    # Cache index protocol
+    # ------------------------------------------------------------------
+
+    def rebuild(self, tasks: Iterable[Task]) -> None:
+        """Rebuild the index from scratch"""
+        self.tasks = {}
+        self.children = {}
+        for task in tasks:
+            self._add(task)
+
+    def upsert(self, task: Task, previous: Optional[Task]) -> None:
+        """Index a new or edited task"""
+        if previous is not None:
+            self._unlink(previous)
+        self._add(task)
+
+    def remove(self, previous: Task) -> None:
+        """Drop a deleted task"""
+        self._unlink(previous)
+        self.tasks.pop(previous.id, None)
+
+    def _add(self, task: Task) -> None:
+        self.tasks[task.id] = task
+        if task.parent:
+            self.children.setdefault(task.parent, set()).add(task.id)
+
+    def _unlink(self, task: Task) -> None:
+        if task.parent:
+            siblings = self.children.get(task.parent)
+            if siblings is not None:
+                siblings.discard(task.id)
+                if not siblings:
+                    del self.children[task.parent]
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def ordered_children(self, task_id: int) -> List[Task]:
+        """Get a task's direct children sorted by their order field"""
+        tasks = [self.tasks[i] for i in self.children.get(task_id, ()) if i in self.tasks]
+        tasks.sort(key=lambda task: (task.order or 0, task.id))
+        return tasks
+
+    def roots(self) -> List[Task]:
+        """Get top-level tasks that have subtasks"""
+        roots = [
+            task
+            for task_id, kids in self.children.items()
+            if kids and (task := self.tasks.get(task_id)) is not None and not task.parent
+        ]
+        roots.sort(key=lambda task: (task.order or 0, task.id))
+        return roots
+
+    def rollup(self, task_id: int) -> Dict[str, int]:
+        """Count descendants of a task and how many are completed"""
+        total = completed = 0
+        stack = [task_id]
+        seen = {task_id}
+        while stack:
+            for child_id in self.children.get(stack.pop(), ()):
+                if child_id in seen or child_id not in self.tasks:
+                    continue
+                seen.add(child_id)
+                total += 1
+                if self.tasks[child_id].completed:
+                    completed += 1
+                stack.append(child_id)
+        return {"total": total, "completed": completed, "open": total - completed}
+
+    def subtree(
+        self,
+        task_id: int,
+        max_depth: int = 3,
+        include_completed: bool = True,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get a task with its ordered descendants
+
+        Args:
+            task_id: Root task ID
+            max_depth: Levels of children to expand
+            include_completed: Include completed children in the tree
+
+        Returns:
+            Nested node dicts, or None if the task is not indexed
+        """
+        task = self.tasks.get(task_id)
+        if task is None:
+            return None
+        return self._node(task, max_depth, include_completed, {task_id})
+
+    def _node(
+        self, task: Task, depth: int, include_completed: bool, seen: Set[int]
+    ) -> Dict[str, Any]:
+        node: Dict[str, Any] = {
+            "id": task.id,
+            "title": task.title,
+            "completed": bool(task.completed),
+            "order": task.order or 0,
+        }
+        if task.id not in self.children:
+            return node
+        node["rollup"] = self.rollup(task.id)
+        if depth <= 0:
+            return node
+        children = []
+        for child in self.ordered_children(task.id):
+            if child.id in seen or (child.completed and not include_completed):
+                continue
+            seen.add(child.id)
+            children.append(self._node(child, depth - 1, include_completed, seen))
+        node["children"] = children
+        return node
@@ -0,0 +1,161 @@
+"""Tests for the agenda index and repeat expansion"""
+
+import itertools
+import sys
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from agenda import AgendaIndex, due_time, iter_occurrences, parse_repeat
+from models import Task
+from task_cache import TaskCache
+
+DAY = 86400
+
+
+class StaticClient:
+    def __init__(self, tasks):
+        self.tasks = tasks
+
+    def get_account_info(self):
+        return {"lastedit_task": 1, "lastdelete_task": 0}
+
+    def iter_task_pages(self, after=0):
+        yield list(self.tasks)
+
+
+def ts(*args) -> int:
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp())
+
+
+def occurrences(anchor, rule, after=0, count=5):
+    return list(itertools.islice(iter_occurrences(anchor, parse_repeat(rule), after), count))
+
+
+def test_parse_repeat_skips_unpredictable_rules():
+    assert parse_repeat("") is None
+    assert parse_repeat("FREQ=DAILY;FROMCOMP") is None
+    assert parse_repeat("FREQ=HOURLY") is None
+    assert parse_repeat("freq=weekly;byday=mo") == {"FREQ": "WEEKLY", "BYDAY": "MO"}
+
+
+def test_daily_interval():
+    anchor = ts(2025, 1, 1)
+    assert occurrences(anchor, "FREQ=DAILY;INTERVAL=3", count=3) == [
+        anchor + 3 * DAY,
+        anchor + 6 * DAY,
+        anchor + 9 * DAY,
+    ]
+
+
+def test_weekly_byday():
+    # 2025-01-01 is a Wednesday
+    assert occurrences(ts(2025, 1, 1), "FREQ=WEEKLY;BYDAY=MO,FR", count=3) == [
+        ts(2025, 1, 3),
+        ts(2025, 1, 6),
+        ts(2025, 1, 10),
+    ]
+
+
+def test_monthly_clamps_to_month_end():
+    assert occurrences(ts(2025, 1, 31), "FREQ=MONTHLY", count=2) == [
+        ts(2025, 2, 28),
+        ts(2025, 3, 31),
+    ]
+
+
+def test_monthly_last_weekday():
+    assert occurrences(ts(2025, 1, 31), "FREQ=MONTHLY;BYDAY=-1FR", count=2) == [
+        ts(2025, 2, 28),
+        ts(2025, 3, 28),
+    ]
+
+
+def test_until_stops_expansion():
+    assert occurrences(ts(2025, 1, 1), "FREQ=DAILY;UNTIL=20250103") == [
+        ts(2025, 1, 2),
+        ts(2025, 1, 3),
+    ]
+
+
+@pytest.mark.parametrize(
+    "rule",
+    [
+        "FREQ=DAILY",
+        "FREQ=DAILY;INTERVAL=3",
+        "FREQ=WEEKLY;INTERVAL=2",
+        "FREQ=WEEKLY;INTERVAL=2;BYDAY=TU,FR",
+        "FREQ=MONTHLY;INTERVAL=5",
+        "FREQ=MONTHLY;INTERVAL=2;BYDAY=2TU",
+        "FREQ=YEARLY",
+    ],
+)
+def test_skip_ahead_matches_full_expansion(rule):
+    anchor = ts(2019, 1, 31, 12)
+    after = ts(2025, 7, 1)
+    full = (t for t in iter_occurrences(anchor, parse_repeat(rule)) if t >= after)
+    assert occurrences(anchor, rule, after, count=10) == list(itertools.islice(full, 10))
+
+
+def test_old_daily_task_reaches_window():
+    index = AgendaIndex()
+    index.rebuild([Task(1, "Water plants", duedate=ts(2023, 1, 1), repeat="FREQ=DAILY")])
+    start = ts(2025, 6, 1)
+    found = index.occurrences(start, start + 7 * DAY - 1)
+    assert [timestamp for timestamp, _ in found] == [start + i * DAY for i in range(7)]
+
+
+def test_duetime_without_duedate_is_not_due():
+    task = Task(1, "Call", duetime=9 * 3600)
+    assert due_time(task) == 0
+    index = AgendaIndex()
+    index.rebuild([task])
+    assert index.range("due", 1, ts(2025, 1, 1)) == []
+
+
+def test_index_tracks_edits_and_completion():
+    index = AgendaIndex()
+    first = Task(1, "Report", duedate=ts(2025, 3, 1))
+    index.rebuild([first])
+    moved = Task(1, "Report", duedate=ts(2025, 3, 5))
+    index.upsert(moved, first)
+    assert index.range("due", ts(2025, 3, 1), ts(2025, 3, 2)) == []
+    assert index.range("due", ts(2025, 3, 5), ts(2025, 3, 5)) == [(ts(2025, 3, 5), moved)]
+    done = Task(1, "Report", duedate=ts(2025, 3, 5), completed=ts(2025, 3, 4))
+    index.upsert(done, moved)
+    assert index.range("due", 0, ts(2026, 1, 1)) == []
+
+
+def test_queries_inside_reading_are_safe_from_concurrent_edits():
+    tasks = [
+        Task(i, f"Daily {i}", duedate=ts(2025, 1, 1), repeat="FREQ=DAILY")
+        for i in range(1, 500)
+    ]
+    cache = TaskCache(StaticClient(tasks))
+    index = AgendaIndex()
+    cache.add_index(index)
+    cache.sync()
+    stop = threading.Event()
+    # Switch threads often so unguarded reads would overlap the edits
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+
+    def churn():
+        while not stop.is_set():
+            for task in tasks:
+                cache.apply([], [task.id])
+            cache.apply(tasks, [])
+
+    writer = threading.Thread(target=churn)
+    writer.start()
+    start = ts(2025, 6, 1)
+    try:
+        for _ in range(50):
+            with cache.reading():
+                index.occurrences(start, start + DAY - 1)
+                index.range("due", 1, start)
+    finally:
+        stop.set()
+        writer.join()
+        sys.setswitchinterval(interval)
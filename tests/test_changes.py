@@ -0,0 +1,75 @@
+"""Tests for sync cursors and change tracking"""
+
+import time
+
+import pytest
+
+from changes import decode_sync_cursor, encode_sync_cursor, get_changes
+from models import Task
+
+
+class FakeClient:
+    def __init__(self):
+        self.tasks = {}
+        self.deleted = []
+        self.account = {"lastedit_task": 0, "lastdelete_task": 0}
+
+    def edit(self, task_id, modified):
+        self.tasks[task_id] = Task(task_id, f"Task {task_id}", modified=modified)
+        self.account["lastedit_task"] = max(self.account["lastedit_task"], modified)
+
+    def delete(self, task_id, stamp):
+        self.tasks.pop(task_id, None)
+        self.deleted.append({"id": task_id, "stamp": stamp})
+        self.account["lastdelete_task"] = max(self.account["lastdelete_task"], stamp)
+
+    def get_account_info(self):
+        return dict(self.account)
+
+    def get_all_tasks(self, after=0):
+        return [task for task in self.tasks.values() if task.modified > after]
+
+    def get_deleted_tasks(self, after=0):
+        return [item for item in self.deleted if item["stamp"] > after]
+
+
+def ids(result):
+    return sorted(task["id"] for task in result["changed"])
+
+
+def test_cursor_is_bound_to_account():
+    cursor = encode_sync_cursor("work", 10, 20, 30, [1], [2])
+    assert decode_sync_cursor(cursor, "work") == (10, 20, 30, [1], [2])
+    with pytest.raises(ValueError):
+        decode_sync_cursor(cursor, "home")
+    with pytest.raises(ValueError):
+        decode_sync_cursor("garbage", "work")
+
+
+def test_changes_since_cursor():
+    client = FakeClient()
+    client.edit(1, modified=100)
+    start = get_changes(client, "a")
+    assert start["changed"] == []
+
+    client.edit(2, modified=200)
+    client.delete(1, stamp=210)
+    result = get_changes(client, "a", start["cursor"])
+    assert ids(result) == [2]
+    assert [item["id"] for item in result["deleted"]] == [1]
+    assert get_changes(client, "a", result["cursor"])["changed"] == []
+
+
+def test_edit_in_the_cursors_own_second_is_not_lost():
+    client = FakeClient()
+    now = int(time.time())
+    client.edit(1, modified=now - 5)
+    first = get_changes(client, "a")
+    client.edit(2, modified=now - 5)
+    client.edit(3, modified=now - 5)
+
+    result = get_changes(client, "a", first["cursor"])
+    assert ids(result) == [1, 2, 3]
+    # Tasks already reported for that second are not repeated
+    client.edit(4, modified=now - 5)
+    assert ids(get_changes(client, "a", result["cursor"])) == [4]
@@ -0,0 +1,38 @@
+"""Tests for log argument summaries and sampling"""
+
+import logging
+
+from logging_setup import SamplingFilter, redact_secrets, summarize_arguments
+
+
+def test_secret_keys_are_redacted_by_whole_name():
+    summary = summarize_arguments({"code": "abc", "refresh_token": "xyz", "max_tokens": 100})
+    assert "abc" not in summary and "xyz" not in summary
+    assert "'max_tokens': 100" in summary
+
+
+def test_large_values_are_shortened():
+    summary = summarize_arguments({"note": "x" * 200, "ids": list(range(50))})
+    assert "(+120 chars)" in summary
+    assert "[list of 50 items]" in summary
+
+
+def test_sampling_keeps_a_fraction_of_records():
+    sampler = SamplingFilter({logging.DEBUG: 0.25, logging.INFO: 0})
+    debug = logging.LogRecord("t", logging.DEBUG, "", 0, "m", None, None)
+    info = logging.LogRecord("t", logging.INFO, "", 0, "m", None, None)
+    warning = logging.LogRecord("t", logging.WARNING, "", 0, "m", None, None)
+    assert sum(sampler.filter(debug) for _ in range(100)) == 25
+    assert not sampler.filter(info)
+    assert sampler.filter(warning)
+
+
+def test_tokens_in_request_urls_are_masked():
+    message = (
+        "401 Client Error: Unauthorized for url: "
+        "https://api.toodledo.com/3/tasks/get.php?start=0&access_token=abc123def&num=10"
+    )
+    redacted = redact_secrets(message)
+    assert "abc123def" not in redacted
+    assert "access_token=***&num=10" in redacted
+    assert redact_secrets("token abc123def leaked", "abc123def") == "token *** leaked"
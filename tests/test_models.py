@@ -0,0 +1,84 @@
+"""Tests for the compact task model"""
+
+import json
+
+from models import Priority, Status, Task, tasks_from_response, tasks_to_api
+
+# A task as returned by tasks/get.php (numbers as ints, text as strings)
+API_TASK = {
+    "id": 12345,
+    "title": "Renew passport",
+    "modified": 1717000000,
+    "completed": 0,
+    "folder": 42,
+    "context": 0,
+    "goal": 0,
+    "location": 0,
+    "tag": "errands, travel",
+    "startdate": 0,
+    "duedate": 1718409600,
+    "duedatemod": 0,
+    "starttime": 0,
+    "duetime": 1718442000,
+    "remind": 60,
+    "repeat": "",
+    "status": 1,
+    "star": 1,
+    "priority": 2,
+    "length": 30,
+    "timer": 0,
+    "added": 1716000000,
+    "note": "Bring old passport",
+    "parent": 0,
+    "children": 0,
+    "order": 0,
+    "meta": "",
+    "previous": 0,
+    "attachment": 0,
+    "shared": 0,
+    "addedby": 0,
+    "via": 0,
+    "attachments": [],
+}
+
+
+def test_round_trip_of_api_task():
+    task = Task.from_api(API_TASK)
+    assert task.priority is Priority.HIGH
+    assert task.status is Status.NEXT_ACTION
+    assert task.to_api() == {
+        key: value for key, value in API_TASK.items() if value not in ("", [])
+    }
+    assert json.dumps(task.to_api())  # enums serialize as plain ints
+
+
+def test_header_is_skipped_and_unknown_keys_kept():
+    response = [{"num": 1, "total": 1}, dict(API_TASK, newfield="x")]
+    (task,) = tasks_from_response(response)
+    assert task._extra == {"newfield": "x"}
+    assert tasks_to_api([task])[0]["newfield"] == "x"
+    assert tasks_to_api([task], fields=["id", "title"]) == [
+        {"id": 12345, "title": "Renew passport"}
+    ]
+
+
+def test_long_notes_are_compressed_and_decode():
+    note = "line of text\n" * 200
+    task = Task.from_api(dict(API_TASK, note=note))
+    assert task._note_packed
+    assert len(task._note) < len(note)
+    assert task.note == note
+    assert task.has_note
+
+
+def test_init_normalises_like_from_api():
+    task = Task(1, "Direct", priority="3", status=9, tag="home")
+    assert task.priority is Priority.TOP
+    assert task.status is Status.CANCELED
+    parsed = Task.from_api({"id": 1, "title": "Direct", "priority": 3, "status": 9, "tag": "home"})
+    assert task == parsed
+
+
+def test_tasks_are_hashable_by_id():
+    first, second = Task(1, "A"), Task(1, "A")
+    assert len({first, second, Task(2, "B")}) == 2
@@ -0,0 +1,42 @@
+"""Tests for cursor pagination"""
+
+import json
+
+import pytest
+
+from pagination import SnapshotStore, byte_budget, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor("abc123", 42)) == ("abc123", 42)
+    with pytest.raises(ValueError):
+        decode_cursor("not a cursor")
+
+
+def test_byte_budget_takes_smallest():
+    assert byte_budget(None, None, 1000) == 1000
+    assert byte_budget(500, None, 1000) == 500
+    assert byte_budget(500, 50, 1000) == 200
+
+
+def test_pages_fit_budget_and_cover_all_items():
+    store = SnapshotStore(max_snapshots=4, ttl=60)
+    items = [{"id": i, "title": f"Task {i}" * 3} for i in range(50)]
+    budget = 300
+    seen = []
+    page, info = store.paginate("a:tasks", lambda: items, None, budget)
+    while True:
+        assert len(json.dumps(page, separators=(",", ":"))) <= budget
+        seen += page
+        if "next_cursor" not in info:
+            break
+        page, info = store.paginate("a:tasks", lambda: [], info["next_cursor"], budget)
+    assert seen == items
+    assert info["total"] == 50
+
+
+def test_cursor_is_bound_to_owner():
+    store = SnapshotStore(max_snapshots=4, ttl=60)
+    _, info = store.paginate("a:tasks", lambda: list(range(100)), None, 10)
+    with pytest.raises(ValueError):
+        store.paginate("b:tasks", lambda: [], info["next_cursor"], 10)
@@ -0,0 +1,114 @@
+"""Tests for priority scheduling of API requests"""
+
+import threading
+import time
+
+import pytest
+
+from rate_limiter import RateLimiter
+from request_scheduler import (
+    BACKGROUND,
+    BULK,
+    INTERACTIVE,
+    RequestScheduler,
+    current_priority,
+    request_priority,
+)
+
+
+def run_requests(scheduler, priority, count, hold, log=None):
+    """Start `count` threads that each hold a slot for `hold` seconds"""
+
+    def work():
+        with scheduler.slot(priority):
+            if log is not None:
+                log.append(priority)
+            time.sleep(hold)
+
+    threads = [threading.Thread(target=work) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def wait_for_queue(scheduler, priority, depth):
+    deadline = time.monotonic() + 2
+    while scheduler.metrics()["classes"][priority]["queued"] < depth:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_interactive_request_overtakes_bulk_flood():
+    scheduler = RequestScheduler(RateLimiter(rate=100, burst=1), {BULK: 2, INTERACTIVE: 4})
+    flood = run_requests(scheduler, BULK, 20, hold=0.005)
+    wait_for_queue(scheduler, BULK, 10)
+
+    started = time.monotonic()
+    with scheduler.slot(INTERACTIVE):
+        waited = time.monotonic() - started
+        bulk_left = scheduler.metrics()["classes"][BULK]["queued"]
+    for thread in flood:
+        thread.join()
+
+    # The flood needs ~0.2s of rate budget; the interactive call only waits for a token
+    assert waited < 0.1
+    assert bulk_left > 0
+    metrics = scheduler.metrics()["classes"]
+    assert metrics[BULK]["dispatched"] == 20
+    assert metrics[INTERACTIVE]["dispatched"] == 1
+    assert metrics[INTERACTIVE]["max_wait_ms"] < 100
+    assert all(c["queued"] == 0 and c["in_flight"] == 0 for c in metrics.values())
+
+
+def test_per_class_concurrency_limit():
+    scheduler = RequestScheduler(None, {BULK: 2})
+    lock = threading.Lock()
+    running = peak = 0
+
+    def work():
+        nonlocal running, peak
+        with scheduler.slot(BULK):
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+
+    threads = [threading.Thread(target=work) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak == 2
+
+
+def test_class_returning_from_idle_gets_no_banked_credit():
+    scheduler = RequestScheduler(RateLimiter(rate=200, burst=1), {BULK: 1, BACKGROUND: 1})
+    # Bulk runs alone for a while, advancing its virtual time
+    for _ in range(30):
+        with scheduler.slot(BULK):
+            pass
+
+    log = []
+    threads = run_requests(scheduler, BULK, 12, hold=0.001, log=log)
+    wait_for_queue(scheduler, BULK, 8)
+    arrived = len(log)
+    threads += run_requests(scheduler, BACKGROUND, 12, hold=0.001, log=log)
+    for thread in threads:
+        thread.join()
+
+    # Weights are 2:1, so bulk keeps most dispatches instead of background
+    # catching up on the time it was idle
+    after = log[arrived:arrived + 9]
+    assert after.count(BULK) >= 4
+
+
+def test_priority_context():
+    assert current_priority() == INTERACTIVE
+    with request_priority(BULK):
+        assert current_priority() == BULK
+    assert current_priority() == INTERACTIVE
+    with pytest.raises(ValueError):
+        with request_priority("urgent"):
+            pass
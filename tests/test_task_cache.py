@@ -0,0 +1,96 @@
+"""Tests for the incremental task cache"""
+
+import time
+
+from models import Task
+from task_cache import TaskCache
+
+
+class FakeClient:
+    """Serves tasks in pages of two, filtered by modified time"""
+
+    def __init__(self):
+        self.tasks = {}
+        self.deleted = []
+        self.account = {"lastedit_task": 0, "lastdelete_task": 0}
+        self.pages_served = 0
+
+    def edit(self, task_id, modified, title="Task"):
+        self.tasks[task_id] = Task(task_id, title, modified=modified)
+        self.account["lastedit_task"] = max(self.account["lastedit_task"], modified)
+
+    def delete(self, task_id, stamp):
+        self.tasks.pop(task_id)
+        self.deleted.append({"id": task_id, "stamp": stamp})
+        self.account["lastdelete_task"] = stamp
+
+    def get_account_info(self):
+        return dict(self.account)
+
+    def iter_task_pages(self, after=0):
+        tasks = sorted(
+            (t for t in self.tasks.values() if t.modified > after), key=lambda t: t.id
+        )
+        for i in range(0, len(tasks), 2):
+            self.pages_served += 1
+            yield tasks[i:i + 2]
+
+    def get_deleted_tasks(self, after=0):
+        return [item for item in self.deleted if item["stamp"] > after]
+
+
+def test_initial_load_then_incremental():
+    client = FakeClient()
+    for task_id in range(1, 6):
+        client.edit(task_id, modified=100)
+    cache = TaskCache(client)
+    assert cache.sync() == {"updated": 5, "removed": 0}
+
+    client.edit(2, modified=200, title="Renamed")
+    client.delete(5, stamp=210)
+    assert cache.sync() == {"updated": 1, "removed": 1}
+    assert cache.get(2).title == "Renamed"
+    assert cache.get(5) is None
+    assert cache.sync() == {"updated": 0, "removed": 0}
+
+
+def test_stopped_sync_leaves_cache_untouched():
+    client = FakeClient()
+    for task_id in range(1, 6):
+        client.edit(task_id, modified=100)
+    cache = TaskCache(client)
+    assert cache.sync(should_stop=lambda: True) is None
+    assert client.pages_served == 1
+    assert not cache.synced and len(cache) == 0
+    assert cache.sync() == {"updated": 5, "removed": 0}
+
+
+def test_stale_sync_results_are_dropped():
+    client = FakeClient()
+    client.edit(1, modified=100)
+    cache = TaskCache(client)
+    cache.sync()
+
+    stale_account = {"lastedit_task": 200, "lastdelete_task": 0}
+    client.edit(1, modified=200, title="Second")
+    client.edit(1, modified=300, title="Third")
+    cache.sync()
+    assert cache.get(1).title == "Third"
+    # A slower sync that read older markers must not overwrite newer data
+    cache.sync(account=stale_account)
+    assert cache.get(1).title == "Third"
+    assert cache.last_edit == 300
+
+
+def test_edit_in_the_markers_own_second_is_picked_up():
+    client = FakeClient()
+    now = int(time.time())
+    client.edit(1, modified=now)
+    cache = TaskCache(client)
+    cache.sync()
+
+    # Same second: the account marker does not move
+    client.edit(2, modified=now, title="Late")
+    assert cache.sync() == {"updated": 1, "removed": 0}
+    assert cache.get(2).title == "Late"
+    assert cache.sync() == {"updated": 0, "removed": 0}
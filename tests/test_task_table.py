@@ -0,0 +1,65 @@
+"""Tests for columnar task aggregates"""
+
+import pytest
+
+from models import Task
+from task_table import TaskTable, parse_date
+
+
+def make_table():
+    return TaskTable.from_tasks([
+        Task(1, "a", folder=10, priority=2, star=1, length=30,
+             duedate=parse_date("2025-03-03")),
+        Task(2, "b", folder=10, priority=0, length=15,
+             duedate=parse_date("2025-03-05"), completed=parse_date("2025-03-04")),
+        Task(3, "c", folder=20, priority=2, length=60,
+             duedate=parse_date("2025-03-10")),
+        Task(4, "d", folder=20, priority=3),
+    ])
+
+
+def test_count_grouped_and_filtered():
+    table = make_table()
+    assert table.query("count")["rows"] == [{"value": 4}]
+    rows = table.query("count", group_by=["folder"], filters={"completed": False})["rows"]
+    assert sorted((row["folder"], row["value"]) for row in rows) == [(10, 1), (20, 2)]
+    assert table.count(filters={"starred": True}) == {(): 1}
+    assert table.count(filters={"priority_min": 2}) == {(): 3}
+
+
+def test_due_range_filter_is_inclusive():
+    table = make_table()
+    filters = {"due_from": "2025-03-03", "due_to": "2025-03-05"}
+    assert table.count(filters=filters) == {(): 2}
+    assert table.count(filters={"due_from": "2025-03-06"}) == {(): 1}
+
+
+def test_sum_length_by_priority():
+    result = make_table().query("sum", group_by=["priority"])
+    assert result["column"] == "length"
+    assert {row["priority"]: row["value"] for row in result["rows"]} == {2: 90, 0: 15, 3: 0}
+
+
+def test_week_histogram_starts_on_monday():
+    result = make_table().query("histogram", column="duedate", bucket="week")
+    # 2025-03-03 and 2025-03-10 are Mondays
+    assert result["rows"] == [
+        {"bucket": "2025-03-03", "count": 2},
+        {"bucket": "2025-03-10", "count": 1},
+    ]
+    assert result["no_value"] == 1
+
+
+def test_numeric_histogram_and_bad_buckets():
+    table = make_table()
+    assert table.query("histogram", column="length", bucket=30)["rows"] == [
+        {"bucket": 0, "count": 2},
+        {"bucket": 30, "count": 1},
+        {"bucket": 60, "count": 1},
+    ]
+    with pytest.raises(ValueError, match="date columns"):
+        table.query("histogram", column="length", bucket="day")
+    with pytest.raises(ValueError):
+        table.query("count", group_by=["title"])
+    with pytest.raises(ValueError):
+        table.query("median")
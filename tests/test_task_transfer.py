@@ -0,0 +1,103 @@
+"""Tests for resumable task export and import"""
+
+import json
+import threading
+
+import pytest
+
+import task_transfer
+from task_transfer import export_tasks, import_tasks, resolve_transfer_path
+
+
+class FakeClient:
+    """Records created tasks and can fail selected requests once"""
+
+    def __init__(self, tasks=(), fail_batches=(), fail_pages=()):
+        self.tasks = list(tasks)
+        self.fail_batches = set(fail_batches)
+        self.fail_pages = set(fail_pages)
+        self.created = []
+        self._lock = threading.Lock()
+
+    def create_tasks_batch(self, batch):
+        first = batch[0]["title"]
+        if first in self.fail_batches:
+            self.fail_batches.discard(first)
+            raise RuntimeError(f"batch starting at {first} failed")
+        with self._lock:
+            self.created.extend(task["title"] for task in batch)
+        return [{"id": i, "title": task["title"]} for i, task in enumerate(batch)]
+
+    def get_tasks(self, completed=None, start=0, num=1000):
+        if start in self.fail_pages:
+            self.fail_pages.discard(start)
+            raise RuntimeError(f"page at {start} failed")
+        header = {"num": len(self.tasks[start:start + num]), "total": len(self.tasks)}
+        return [header] + self.tasks[start:start + num]
+
+
+def write_ndjson(path, count):
+    with open(path, "w") as f:
+        for i in range(count):
+            f.write(json.dumps({"title": f"t{i}"}) + "\n")
+
+
+def test_import_resume_creates_each_task_once(tmp_path):
+    source = tmp_path / "tasks.ndjson"
+    write_ndjson(source, 250)
+    client = FakeClient(fail_batches={"t50"})
+
+    with pytest.raises(RuntimeError):
+        import_tasks(client, str(source), workers=2)
+    result = import_tasks(client, str(source), workers=2)
+
+    assert sorted(client.created) == sorted(f"t{i}" for i in range(250))
+    assert result["created"] == 250
+    assert not (tmp_path / "tasks.ndjson.progress").exists()
+
+
+def test_import_counts_skipped_records_once(tmp_path):
+    source = tmp_path / "tasks.ndjson"
+    with open(source, "w") as f:
+        for i in range(120):
+            f.write(json.dumps({"title": f"t{i}"} if i % 10 else {"note": "untitled"}) + "\n")
+    client = FakeClient(fail_batches={"t1"})
+
+    with pytest.raises(RuntimeError):
+        import_tasks(client, str(source), workers=3)
+    result = import_tasks(client, str(source), workers=3)
+
+    assert len(client.created) == len(set(client.created)) == 108
+    assert (result["created"], result["skipped"]) == (108, 12)
+
+
+def test_export_resume_writes_each_task_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(task_transfer, "PAGE_SIZE", 10)
+    tasks = [{"id": i, "title": f"t{i}", "modified": 1} for i in range(45)]
+    client = FakeClient(tasks, fail_pages={30})
+    output = tmp_path / "backup.ndjson"
+
+    with pytest.raises(RuntimeError):
+        export_tasks(client, str(output), workers=2)
+    result = export_tasks(client, str(output), workers=2)
+
+    with open(output) as f:
+        written = [json.loads(line)["id"] for line in f]
+    assert written == list(range(45))
+    assert result["exported"] == 45
+    assert not (tmp_path / "backup.ndjson.progress").exists()
+
+
+def test_export_refuses_to_overwrite(tmp_path):
+    output = tmp_path / "tokens.json"
+    output.write_text("{}")
+    with pytest.raises(ValueError):
+        export_tasks(FakeClient(), str(output), file_format="ndjson", overwrite=False)
+    assert output.read_text() == "{}"
+
+
+def test_transfer_paths_stay_in_directory(tmp_path):
+    assert resolve_transfer_path("a/b.csv", str(tmp_path)) == str(tmp_path / "a" / "b.csv")
+    for path in ("../escape.csv", "/etc/passwd", "", "."):
+        with pytest.raises(ValueError):
+            resolve_transfer_path(path, str(tmp_path))
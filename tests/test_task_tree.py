@@ -0,0 +1,89 @@
+"""Tests for the subtask index"""
+
+import sys
+import threading
+
+from models import Task
+from task_cache import TaskCache
+from task_tree import TaskTree
+
+
+def make_tree():
+    tree = TaskTree()
+    tree.rebuild([
+        Task(1, "Project"),
+        Task(2, "Step two", parent=1, order=2),
+        Task(3, "Step one", parent=1, order=1, completed=100),
+        Task(4, "Detail", parent=2),
+        Task(5, "Loose task"),
+    ])
+    return tree
+
+
+def test_subtree_orders_children_and_limits_depth():
+    tree = make_tree()
+    node = tree.subtree(1, max_depth=1)
+    assert [child["id"] for child in node["children"]] == [3, 2]
+    assert node["rollup"] == {"total": 3, "completed": 1, "open": 2}
+    # Step two has children, but they are beyond max_depth
+    assert "children" not in node["children"][1]
+    assert node["children"][1]["rollup"]["total"] == 1
+    assert tree.subtree(99) is None
+
+
+def test_subtree_can_hide_completed_children():
+    node = make_tree().subtree(1, include_completed=False)
+    assert [child["id"] for child in node["children"]] == [2]
+    assert node["children"][0]["children"][0]["id"] == 4
+
+
+def test_roots_and_moves():
+    tree = make_tree()
+    assert [task.id for task in tree.roots()] == [1]
+    moved = Task(4, "Detail", parent=5)
+    tree.upsert(moved, Task(4, "Detail", parent=2))
+    assert [task.id for task in tree.roots()] == [1, 5]
+    assert tree.rollup(2)["total"] == 0
+    tree.remove(moved)
+    assert [task.id for task in tree.roots()] == [1]
+
+
+class StaticClient:
+    def __init__(self, tasks):
+        self.tasks = tasks
+
+    def get_account_info(self):
+        return {"lastedit_task": 1, "lastdelete_task": 0}
+
+    def iter_task_pages(self, after=0):
+        yield list(self.tasks)
+
+
+def test_reads_inside_reading_are_safe_from_concurrent_edits():
+    tasks = [Task(1, "Root")] + [Task(i, f"Child {i}", parent=1) for i in range(2, 2000)]
+    cache = TaskCache(StaticClient(tasks))
+    tree = TaskTree()
+    cache.add_index(tree)
+    cache.sync()
+    stop = threading.Event()
+    # Switch threads often so unguarded reads would overlap the edits
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+
+    def churn():
+        while not stop.is_set():
+            for task in tasks[1:]:
+                cache.apply([], [task.id])
+            cache.apply(tasks[1:], [])
+
+    writer = threading.Thread(target=churn)
+    writer.start()
+    try:
+        for _ in range(200):
+            with cache.reading():
+                tree.rollup(1)
+                tree.roots()
+    finally:
+        stop.set()
+        writer.join()
+        sys.setswitchinterval(interval)
@@ -5,6 +5,7 @@ Handles token storage, refresh, and validation
 
 import json
 import logging
+import threading
 import time
 from pathlib import Path
 from typing import Optional
@@ -12,15 +13,18 @@ from typing import Optional
 import requests
 
 from config import get_settings
+from logging_setup import summarize_arguments
 
 
 class TokenManager:
     """Manages OAuth2 tokens for Toodledo API"""
 
-    def __init__(self):
+    def __init__(self, token_path: Optional[str] = None):
         self.settings = get_settings()
-        self.token_path = Path(self.settings.token_storage_path).expanduser()
+        self.token_path = Path(token_path or self.settings.token_storage_path).expanduser()
         self.tokens = self._load_tokens()
+        # Refresh tokens rotate, so only one refresh may run at a time
+        self._refresh_lock = threading.RLock()
 
     def _load_tokens(self) -> dict:
         """Load tokens from storage file"""
@@ -57,15 +61,34 @@ class TokenManager:
         expires_at = self.tokens["expires_at"]
         return time.time() >= (expires_at - 300)
 
+    def seconds_until_expiry(self) -> float:
+        """Seconds until the access token expires (0 if unknown or expired)"""
+        return max(self.tokens.get("expires_at", 0) - time.time(), 0)
+
     def get_access_token(self) -> str:
         """Get valid access token, refreshing if needed"""
         if self.is_token_expired():
-            self.refresh_access_token()
+            with self._refresh_lock:
+                # Another thread may have refreshed while we waited for the lock
+                if self.is_token_expired():
+                    self.refresh_access_token()
 
         return self.tokens.get("access_token", "")
 
-    def refresh_access_token(self) -> None:
-        """Refresh access token using refresh token"""
+    def refresh_access_token(self, min_validity: float = 0) -> None:
+        """
+        Refresh access token using refresh token
+
+        Args:
+            min_validity: Skip the refresh if the token is still valid for at
+                least this many seconds once the refresh lock is held
+        """
+        with self._refresh_lock:
+            if min_validity and self.seconds_until_expiry() >= min_validity:
+                return
+            self._refresh()
+
+    def _refresh(self) -> None:
         refresh_token = self.tokens.get("refresh_token")
         if not refresh_token:
             raise ValueError("No refresh token available. Please re-authorize the app.")
@@ -127,10 +150,9 @@ class TokenManager:
         try:
             logging.info(f"Token exchange request - URL: {url}")
             logging.info(f"Token exchange request - Auth: {auth[0]}:***")
-            logging.info(f"Token exchange request - Data: {data}")
+            logging.info(f"Token exchange request - Data: {summarize_arguments(data)}")
             response = requests.post(url, auth=auth, data=data, timeout=10)
             logging.info(f"Token exchange response - Status: {response.status_code}")
-            logging.info(f"Token exchange response - Body: {response.text}")
             response.raise_for_status()
             token_data = response.json()
 
@@ -3,21 +3,30 @@ Toodledo API Client
 Handles all API calls to Toodledo
 """
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 import requests
 
 from config import get_settings
+from logging_setup import redact_secrets
+from models import REQUESTED_FIELDS, Task, tasks_from_response
+from request_scheduler import RequestScheduler
 from token_manager import TokenManager
 
 
 class ToodledoClient:
     """Client for Toodledo API"""
 
-    def __init__(self, token_manager: TokenManager):
+    def __init__(
+        self,
+        token_manager: TokenManager,
+        session: Optional[requests.Session] = None,
+        scheduler: Optional[RequestScheduler] = None,
+    ):
         self.settings = get_settings()
         self.token_manager = token_manager
-        self.session = requests.Session()
+        self.session = session or requests.Session()
+        self.scheduler = scheduler
 
     def _get_headers(self) -> Dict[str, str]:
         """Get request headers with authorization"""
@@ -35,11 +44,26 @@ class ToodledoClient:
         data: Optional[Dict[str, Any]] = None,
     ) -> Any:
         """Make HTTP request to Toodledo API"""
-        import json
-
         url = f"{self.settings.toodledo_api_base_url}{endpoint}"
         access_token = self.token_manager.get_access_token()
 
+        if self.scheduler is None:
+            return self._send(method, url, access_token, params, data)
+        # Queue behind other requests for this account according to priority
+        with self.scheduler.slot():
+            return self._send(method, url, access_token, params, data)
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        access_token: str,
+        params: Optional[Dict[str, Any]],
+        data: Optional[Dict[str, Any]],
+    ) -> Any:
+        """Send a single HTTP request"""
+        import json
+
         try:
             if method.upper() == "GET":
                 # GET: access_token and params in URL query string
@@ -61,7 +85,9 @@ class ToodledoClient:
             return response.json()
 
         except requests.RequestException as e:
-            raise Exception(f"API request failed: {str(e)}")
+            # Error messages include the request URL, and with it the access token
+            message = redact_secrets(str(e), access_token)
+            raise Exception(f"API request failed: {message}") from None
 
     def get_account_info(self) -> Dict[str, Any]:
         """Get account information"""
@@ -94,7 +120,7 @@ class ToodledoClient:
         params = {
             "start": start,
             "num": min(num, 1000),
-            "fields": "folder,context,goal,location,tag,startdate,duedate,duedatemod,starttime,duetime,remind,repeat,status,star,priority,length,timer,added,note,parent,children,order,meta,previous,attachment,shared,addedby,via,attachments"
+            "fields": ",".join(REQUESTED_FIELDS),
         }
 
         if completed is not None:
@@ -108,6 +134,53 @@ class ToodledoClient:
 
         return self._make_request("GET", "/tasks/get.php", params=params)
 
+    def iter_task_pages(self, page_size: int = 1000, **kwargs) -> Iterator[List[Task]]:
+        """
+        Page through all matching tasks
+
+        Args:
+            page_size: Tasks per request (max 1000)
+            **kwargs: Same filters as get_tasks (except start/num)
+
+        Yields:
+            Lists of Task objects, one per API page
+        """
+        page_size = min(page_size, 1000)
+        start = 0
+        while True:
+            result = self.get_tasks(start=start, num=page_size, **kwargs)
+            tasks = tasks_from_response(result)
+            if tasks:
+                yield tasks
+            total = None
+            if isinstance(result, list) and result and isinstance(result[0], dict):
+                total = result[0].get("total")
+            start += len(tasks)
+            if len(tasks) < page_size or (total is not None and start >= int(total)):
+                break
+
+    def get_all_tasks(self, **kwargs) -> List[Task]:
+        """Get all matching tasks as Task objects, following pagination"""
+        tasks: List[Task] = []
+        for page in self.iter_task_pages(**kwargs):
+            tasks.extend(page)
+        return tasks
+
+    def get_deleted_tasks(self, after: int = 0) -> List[Dict[str, Any]]:
+        """
+        Get tasks deleted after a timestamp
+
+        Args:
+            after: Only return tasks deleted after this timestamp
+
+        Returns:
+            List of {"id": ..., "stamp": ...} entries (response header stripped)
+        """
+        result = self._make_request("GET", "/tasks/deleted.php", params={"after": after})
+        if not isinstance(result, list):
+            return []
+        return [item for item in result if isinstance(item, dict) and "id" in item]
+
     def get_folders(self) -> List[Dict[str, Any]]:
         """Get all folders"""
         return self._make_request("GET", "/folders/get.php")
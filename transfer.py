@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Export or import Toodledo tasks
+Streams tasks to or from an NDJSON or CSV file
+"""
+
+import argparse
+import sys
+
+from task_transfer import FORMATS, export_tasks, import_tasks
+from token_manager import TokenManager
+from toodledo_client import ToodledoClient
+
+parser = argparse.ArgumentParser(description="Export or import Toodledo tasks")
+parser.add_argument("command", choices=["export", "import"])
+parser.add_argument("path", help="NDJSON or CSV file (format taken from the extension)")
+parser.add_argument("--format", choices=FORMATS, help="Override the file format")
+parser.add_argument(
+    "--status",
+    choices=["incomplete", "complete", "all"],
+    default="all",
+    help="Tasks to export (default: all)",
+)
+parser.add_argument("--workers", type=int, default=2, help="Parallel API requests (default: 2)")
+parser.add_argument("--restart", action="store_true", help="Ignore saved progress and start over")
+parser.add_argument("--tokens", help="Token file to use (default: TOKEN_STORAGE_PATH)")
+args = parser.parse_args()
+
+print("=" * 60)
+print(f"Toodledo Task {args.command.title()}")
+print("=" * 60)
+print()
+
+try:
+    token_manager = TokenManager(args.tokens)
+    if not token_manager.has_tokens():
+        print("❌ Not authorized. Run: python authorize.py CODE_HERE")
+        sys.exit(1)
+    client = ToodledoClient(token_manager)
+
+    if args.command == "export":
+        result = export_tasks(
+            client,
+            args.path,
+            file_format=args.format,
+            status=args.status,
+            workers=args.workers,
+            resume=not args.restart,
+        )
+        print(f"✓ Exported {result['exported']} tasks to {result['path']}")
+    else:
+        result = import_tasks(
+            client,
+            args.path,
+            file_format=args.format,
+            workers=args.workers,
+            resume=not args.restart,
+        )
+        print(f"✓ Created {result['created']} tasks from {result['path']}")
+        if result["failed"] or result["skipped"]:
+            print(f"  {result['failed']} failed, {result['skipped']} skipped (no title)")
+
+except KeyboardInterrupt:
+    print()
+    print("Interrupted. Run the same command again to resume.")
+    sys.exit(130)
+except Exception as e:
+    print()
+    print(f"❌ {args.command.title()} failed: {e}")
+    print("Run the same command again to resume.")
+    sys.exit(1)